@@ -0,0 +1,40 @@
+"""add_market_highlights_indexes
+
+Revision ID: c3d9a5e71f42
+Revises: b756e412181b
+Create Date: 2026-10-16 04:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d9a5e71f42'
+down_revision = 'b756e412181b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Top-N signals per type ordered by confidence, read straight off the index
+    op.create_index(
+        'idx_signals_type_confidence',
+        'signals',
+        ['signal_type', sa.text('confidence_score DESC')],
+        unique=False,
+        postgresql_include=['stock_id'],
+    )
+    # Active stocks per market, covering the id used for joins
+    op.create_index(
+        'idx_stocks_market_active',
+        'stocks',
+        ['market', 'is_active'],
+        unique=False,
+        postgresql_include=['id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_stocks_market_active', table_name='stocks')
+    op.drop_index('idx_signals_type_confidence', table_name='signals')
@@ -0,0 +1,153 @@
+"""ASGI middleware for API requests."""
+
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.api.responses import (
+    cacheable_envelope,
+    cached_json_response,
+    etag_matches,
+    not_modified_response,
+    validator_headers,
+)
+from app.database import SessionLocal
+from app.services.cache import cache_service, payload_etag
+
+
+class RequestTimeMiddleware:
+    """
+    Stamp each HTTP request once with the current UTC time.
+
+    Handlers read it as ``request.state.now`` for response metadata instead
+    of calling the clock themselves. Implemented as plain ASGI (not
+    BaseHTTPMiddleware) so it adds no extra task or body wrapping per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["now"] = datetime.now(timezone.utc)
+        await self.app(scope, receive, send)
+
+
+class DBSessionMiddleware:
+    """
+    Open one sync database session per HTTP request as ``request.state.db``.
+
+    Handlers commit their own writes. Whatever transaction is left open
+    (reads, or uncommitted work after an error) is rolled back as the
+    response starts, returning the connection to the pool before the client
+    sees the response, and the session is always closed once the request
+    finishes. Sessions are lazy, so requests that never touch the database
+    never check out a connection and skip the threadpool hop for rollback.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = SessionLocal()
+        scope.setdefault("state", {})["db"] = session
+
+        async def release() -> None:
+            if session.in_transaction():
+                await run_in_threadpool(session.rollback)
+
+        async def send_after_release(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_after_release)
+        except Exception:
+            await release()
+            raise
+        finally:
+            session.close()
+
+
+class ResponseCacheMiddleware:
+    """
+    Read-through Redis cache for the JSON envelopes of selected GET routes.
+
+    Routes are matched by ``fnmatch`` path pattern against a table of TTLs
+    in seconds. Responses are
+    keyed by path plus sorted query string and stored in their cached form
+    (timestamp placeholder, ``cache_hit: true``) with an ETag, so hits and
+    revalidations are answered without reaching the route. Only 200s are
+    stored, and a route can opt a response out with ``Cache-Control: no-store``.
+
+    Must run inside RequestTimeMiddleware, which provides the request time.
+    """
+
+    def __init__(self, app: ASGIApp, ttl_table: Dict[str, int]) -> None:
+        self.app = app
+        self.ttl_table = ttl_table
+
+    def _ttl(self, path: str) -> Optional[int]:
+        """TTL for a request path, or None if its responses are not cached."""
+        for pattern, ttl in self.ttl_table.items():
+            if fnmatchcase(path, pattern):
+                return ttl
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        ttl = self._ttl(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if ttl is None:
+            await self.app(scope, receive, send)
+            return
+
+        query = urlencode(sorted(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)))
+        cache_key = f"resp:{scope['path']}?{query}"
+        now = scope["state"]["now"]
+
+        # Answer revalidation from the stored ETag alone
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match:
+            etag = await cache_service.get_etag_async(cache_key)
+            if etag_matches(if_none_match, etag):
+                await not_modified_response(etag)(scope, receive, send)
+                return
+
+        cached = await cache_service.get_raw_async(cache_key)
+        if cached is not None:
+            await cached_json_response(cached, payload_etag(cached), now)(scope, receive, send)
+            return
+
+        # Miss: hold the response until its body is complete, cache it, then send
+        start: Message = {}
+        chunks: List[bytes] = []
+
+        async def send_and_cache(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start)
+            if start["status"] == 200 and "no-store" not in headers.get("cache-control", ""):
+                payload = cacheable_envelope(body, now)
+                await cache_service.set_raw_async(cache_key, payload, ttl)
+                headers.update(validator_headers(payload_etag(payload)))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_and_cache)
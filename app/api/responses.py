@@ -0,0 +1,157 @@
+"""Helpers for serving pre-serialized JSON API responses."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import orjson
+from fastapi import Response
+from app.schemas.common import SuccessResponse, Meta
+
+# Browsers and dashboards may reuse a response briefly before revalidating
+CACHE_CONTROL = "public, max-age=60"
+
+# Stands in for meta.timestamp in cached envelopes; filled in per response
+TIMESTAMP_PLACEHOLDER = "__TS__"
+_TIMESTAMP_PLACEHOLDER_JSON = b'"' + TIMESTAMP_PLACEHOLDER.encode() + b'"'
+
+
+def serialize_envelope(data: Any, meta: Optional[Meta] = None, for_cache: bool = False) -> bytes:
+    """
+    Serialize a SuccessResponse envelope to JSON bytes.
+
+    Args:
+        data: Response payload (pydantic model, dict or list)
+        meta: Response metadata
+        for_cache: Write TIMESTAMP_PLACEHOLDER instead of meta.timestamp so
+            cached_json_response can stamp each hit with its request time
+
+    Returns:
+        JSON-encoded envelope
+    """
+    # Straight to JSON in one pass (no intermediate dict); the same bytes serve
+    # the response and the cache
+    payload = SuccessResponse(data=data, meta=meta).model_dump_json().encode()
+    if for_cache and meta is not None:
+        head, sep, meta_json = payload.rpartition(b'"meta":{')
+        meta_json = meta_json.replace(
+            orjson.dumps(meta.timestamp, option=orjson.OPT_UTC_Z), _TIMESTAMP_PLACEHOLDER_JSON, 1
+        )
+        payload = head + sep + meta_json
+    return payload
+
+
+def serialize_list_envelope(
+    items: List[bytes],
+    data: Any,
+    meta: Optional[Meta] = None,
+    for_cache: bool = False,
+) -> bytes:
+    """
+    Serialize a list envelope whose items are already JSON-encoded.
+
+    Args:
+        items: JSON-encoded list items, in order
+        data: List response model built with ``items=[]`` (totals, paging)
+        meta: Response metadata
+        for_cache: Write TIMESTAMP_PLACEHOLDER instead of meta.timestamp
+
+    Returns:
+        JSON-encoded envelope with the items spliced into ``data.items``
+    """
+    envelope = serialize_envelope(data, meta, for_cache=for_cache)
+    return envelope.replace(b'"items":[]', b'"items":[' + b",".join(items) + b"]", 1)
+
+
+def cacheable_envelope(payload: bytes, timestamp: datetime) -> bytes:
+    """
+    Convert a served envelope back into its cached form.
+
+    The inverse of cached_json_response: swaps the request time in
+    meta.timestamp back to TIMESTAMP_PLACEHOLDER and marks it a cache hit.
+
+    Args:
+        payload: Envelope as sent, with meta.timestamp set to ``timestamp``
+        timestamp: Request time reported in the envelope
+
+    Returns:
+        Envelope as it would have been written with ``for_cache=True``
+    """
+    head, sep, meta = payload.rpartition(b'"meta":{')
+    if not sep:
+        return payload
+    meta = meta.replace(
+        orjson.dumps(timestamp, option=orjson.OPT_UTC_Z),
+        _TIMESTAMP_PLACEHOLDER_JSON,
+        1,
+    ).replace(b'"cache_hit":false', b'"cache_hit":true', 1)
+    return head + sep + meta
+
+
+def json_response(payload: bytes, etag: Optional[str] = None) -> Response:
+    """Return pre-serialized JSON bytes, with caching headers if an ETag is given."""
+    headers = validator_headers(etag) if etag else None
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+def cached_json_response(
+    payload: bytes,
+    etag: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> Response:
+    """
+    Return cached JSON bytes, skipping model validation and encoding.
+
+    The only per-response work is one substring replace that stamps the
+    timestamp placeholder with the request time.
+
+    Args:
+        payload: Envelope written with ``for_cache=True``
+        etag: ETag of the cached payload
+        timestamp: Request time to report in meta.timestamp
+
+    Returns:
+        JSON response marked as a cache hit
+    """
+    if timestamp is not None:
+        payload = payload.replace(
+            _TIMESTAMP_PLACEHOLDER_JSON,
+            orjson.dumps(timestamp, option=orjson.OPT_UTC_Z),
+            1,
+        )
+    response = json_response(payload, etag)
+    response.headers["X-Cache"] = "HIT"
+    return response
+
+
+def validator_headers(etag: str) -> Dict[str, str]:
+    """HTTP caching headers for a response with the given ETag."""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+
+    Args:
+        if_none_match: Raw If-None-Match request header
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """Return an empty 304 telling the client to reuse its cached copy."""
+    return Response(status_code=304, headers=validator_headers(etag))
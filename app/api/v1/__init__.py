@@ -1,5 +1,5 @@
 """API v1 routes."""
 
-from app.api.v1 import stocks, signals, markets, backtest
+from app.api.v1 import stocks, signals, markets, backtest, ml_training, system
 
-__all__ = ["stocks", "signals", "markets", "backtest"]
+__all__ = ["stocks", "signals", "markets", "backtest", "ml_training", "system"]
@@ -0,0 +1,254 @@
+"""Shared preprocessing for the rule-based and ML signal generators."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+import itertools
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.fundamental import Fundamental
+from app.models.price import StockPrice
+from app.models.stock import Stock, StockType
+from app.models.technical_indicator import TechnicalIndicator
+from app.services.indicator_calculator import IndicatorCalculator
+from app.services.stock_classifier import StockClassifier
+
+# Stored indicator columns used by the generators, in calculate_all_indicators' keys
+INDICATOR_FIELDS = (
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_histogram",
+    "sma_20",
+    "sma_50",
+    "sma_200",
+    "ema_12",
+    "ema_26",
+    "bollinger_upper",
+    "bollinger_middle",
+    "bollinger_lower",
+    "volume_avg",
+)
+
+# Stored indicators at most this old (and complete) are used without recomputing
+INDICATOR_MAX_AGE = timedelta(days=1)
+
+
+@dataclass(slots=True)
+class SignalContext:
+    """Inputs shared by both signal generator paths for a single stock."""
+    prices_df: pd.DataFrame
+    indicators: Dict[str, Any]
+    latest_indicator: Optional[TechnicalIndicator] = None
+    fundamental: Optional[Fundamental] = None
+    fundamentals_dict: Dict[str, Any] = field(default_factory=dict)
+    stock_type: Optional[StockType] = None
+
+
+def _load_prices_df(db: Session, stock_id: int, limit: int = 200) -> pd.DataFrame:
+    """
+    Load the latest OHLCV bars for a stock as a time-ascending DataFrame.
+
+    Reads plain column tuples (no ORM hydration) and builds the frame from
+    numpy arrays. Time stays a column (not the index) for compatibility with
+    the indicator calculator.
+
+    Args:
+        db: Database session
+        stock_id: Stock ID
+        limit: Maximum number of most recent bars to load
+
+    Returns:
+        DataFrame with columns: time, open, high, low, close, volume
+    """
+    rows = db.execute(
+        select(
+            StockPrice.time,
+            StockPrice.open,
+            StockPrice.high,
+            StockPrice.low,
+            StockPrice.close,
+            StockPrice.volume,
+        )
+        .where(StockPrice.stock_id == stock_id)
+        .order_by(StockPrice.time.desc())
+        .limit(limit)
+    ).all()
+
+    # Rows arrive newest first (so the limit keeps the latest bars); reverse
+    # with views rather than re-sorting.
+    ohlcv = np.fromiter(
+        itertools.chain.from_iterable(row[1:] for row in rows),
+        dtype=np.float64,
+        count=len(rows) * 5,
+    ).reshape(-1, 5)[::-1]
+    times = pd.to_datetime([row[0] for row in reversed(rows)], utc=True)
+
+    return pd.DataFrame(
+        {
+            "time": times,
+            "open": ohlcv[:, 0],
+            "high": ohlcv[:, 1],
+            "low": ohlcv[:, 2],
+            "close": ohlcv[:, 3],
+            "volume": ohlcv[:, 4],
+        },
+        copy=False,
+    )
+
+
+def _load_latest_indicator_and_fundamental(
+    db: Session, stock_id: int
+) -> Tuple[Optional[TechnicalIndicator], Optional[Fundamental]]:
+    """
+    Fetch a stock's latest technical indicator and fundamentals in one query.
+
+    Both rows are outer-joined onto the stock by their latest id, so a single
+    round trip returns either, both or neither.
+
+    Args:
+        db: Database session
+        stock_id: Stock ID
+
+    Returns:
+        Tuple of (latest TechnicalIndicator or None, latest Fundamental or None)
+    """
+    latest_indicator_id = (
+        select(TechnicalIndicator.id)
+        .where(TechnicalIndicator.stock_id == stock_id)
+        .order_by(TechnicalIndicator.date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    latest_fundamental_id = (
+        select(Fundamental.id)
+        .where(Fundamental.stock_id == stock_id)
+        .order_by(Fundamental.date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(TechnicalIndicator, Fundamental)
+        .select_from(Stock)
+        .outerjoin(TechnicalIndicator, TechnicalIndicator.id == latest_indicator_id)
+        .outerjoin(Fundamental, Fundamental.id == latest_fundamental_id)
+        .where(Stock.id == stock_id)
+    ).first()
+    if row is None:
+        return None, None
+    return row[0], row[1]
+
+
+def _stored_indicators(latest_indicator: Optional[TechnicalIndicator]) -> Optional[Dict[str, Any]]:
+    """
+    Indicators from a stored row, if it is recent and has every field set.
+
+    Args:
+        latest_indicator: Latest TechnicalIndicator for the stock, if any
+
+    Returns:
+        Indicator dict (same keys as calculate_all_indicators), or None if the
+        row is missing, stale or incomplete and indicators must be recomputed
+    """
+    if latest_indicator is None:
+        return None
+    if latest_indicator.date < datetime.now(timezone.utc).date() - INDICATOR_MAX_AGE:
+        return None
+    indicators = {name: getattr(latest_indicator, name) for name in INDICATOR_FIELDS}
+    if any(value is None for value in indicators.values()):
+        return None
+    return indicators
+
+
+def _build_signal_context(stock: Stock, db: Session) -> SignalContext:
+    """
+    Gather prices, indicators and fundamentals needed to generate a signal.
+
+    Indicators are taken straight from a fresh, complete TechnicalIndicator
+    row; otherwise they are recomputed from prices, with any stored values
+    taking precedence.
+
+    The stock's classification comes from Stock.stock_type (kept current by
+    fundamentals ingestion). An unclassified stock is classified from its
+    latest fundamentals and the result is set on the stock, left for the
+    caller to commit along with the generated signal.
+
+    Args:
+        stock: Stock to generate a signal for
+        db: Database session
+
+    Returns:
+        SignalContext for the stock
+
+    Raises:
+        ValueError: If fewer than 20 price records are available
+    """
+    # Use price data from the database (fast, no network calls)
+    prices_df = _load_prices_df(db, stock.id)
+
+    if len(prices_df) < 20:
+        raise ValueError(f"Insufficient price data in database for {stock.symbol} ({len(prices_df)} records, need 20+)")
+
+    # Latest technical indicator and fundamentals (either may be missing)
+    latest_indicator, fundamental = _load_latest_indicator_and_fundamental(db, stock.id)
+
+    # A fresh, complete stored row makes recomputing from prices unnecessary
+    indicators = _stored_indicators(latest_indicator)
+    if indicators is None:
+        indicators = IndicatorCalculator.calculate_all_indicators(prices_df)
+
+        if latest_indicator:
+            # Use DB indicators if available
+            indicators.update(
+                {
+                    "rsi": latest_indicator.rsi,
+                    "macd": latest_indicator.macd,
+                    "macd_signal": latest_indicator.macd_signal,
+                    "macd_histogram": latest_indicator.macd_histogram,
+                    "sma_20": latest_indicator.sma_20,
+                    "sma_50": latest_indicator.sma_50,
+                    "sma_200": latest_indicator.sma_200,
+                    "ema_12": latest_indicator.ema_12,
+                    "ema_26": latest_indicator.ema_26,
+                    "bollinger_upper": latest_indicator.bollinger_upper,
+                    "bollinger_lower": latest_indicator.bollinger_lower,
+                    "volume_avg": latest_indicator.volume_avg,
+                }
+            )
+
+    context = SignalContext(
+        prices_df=prices_df,
+        indicators=indicators,
+        latest_indicator=latest_indicator,
+    )
+
+    if fundamental:
+        context.fundamental = fundamental
+        context.fundamentals_dict = {
+            "revenue": fundamental.revenue,
+            "eps": fundamental.eps,
+            "pe_ratio": fundamental.pe_ratio,
+            "debt_ratio": fundamental.debt_ratio,
+            "earnings_growth": fundamental.earnings_growth,
+            "dividend_yield": fundamental.dividend_yield,
+            "dividend_per_share": fundamental.dividend_per_share,
+            "dividend_payout_ratio": fundamental.dividend_payout_ratio,
+        }
+
+        # Stocks are classified when their fundamentals are ingested; only
+        # stocks never classified that way are classified (and saved) here
+        context.stock_type = stock.stock_type
+        if context.stock_type is None:
+            context.stock_type = StockClassifier.classify_stock(
+                dividend_yield=fundamental.dividend_yield,
+                earnings_growth=fundamental.earnings_growth,
+                pe_ratio=fundamental.pe_ratio,
+                dividend_payout_ratio=fundamental.dividend_payout_ratio,
+            )
+            stock.stock_type = context.stock_type
+
+    return context
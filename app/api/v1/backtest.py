@@ -1,19 +1,25 @@
 """Backtesting API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from typing import Optional
 from app.database import get_db
-from app.models.stock import Stock
 from app.schemas.common import SuccessResponse, Meta
 from app.services.backtest import BacktestService
+from app.services.stock_lookup import resolve_stock_id_sync
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.get("/{symbol}/backtest", response_model=SuccessResponse)
 def get_backtest_performance(
+    request: Request,
     symbol: str,
     start_date: Optional[date] = Query(None, description="Start date (default: 1 year ago)"),
     end_date: Optional[date] = Query(None, description="End date (default: today)"),
@@ -29,8 +35,8 @@ def get_backtest_performance(
     - Volatility
     - Sharpe ratio
     """
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
-    if not stock:
+    stock_id = resolve_stock_id_sync(db, symbol)
+    if stock_id is None:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
     # Default to 1 year if not specified
@@ -44,7 +50,7 @@ def get_backtest_performance(
 
     try:
         performance = BacktestService.calculate_signal_performance(
-            stock_id=stock.id,
+            stock_id=stock_id,
             start_date=start_date,
             end_date=end_date,
             db=db,
@@ -52,14 +58,18 @@ def get_backtest_performance(
 
         return SuccessResponse(
             data=performance,
-            meta=Meta(timestamp=datetime.utcnow()),
+            meta=Meta(timestamp=request.state.now),
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating backtest: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Error calculating backtest: {str(e)}")
+    except SQLAlchemyError:
+        logger.exception("Database error calculating backtest for %s", symbol)
+        raise HTTPException(status_code=503, detail="Database unavailable")
 
 
 @router.post("/run", response_model=SuccessResponse)
 def run_backtest(
+    request: Request,
     symbol: str = Body(..., description="Stock symbol"),
     start_date: date = Body(..., description="Start date"),
     end_date: date = Body(..., description="End date"),
@@ -71,8 +81,8 @@ def run_backtest(
 
     Optionally compare against a benchmark (e.g., S&P 500 return).
     """
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
-    if not stock:
+    stock_id = resolve_stock_id_sync(db, symbol)
+    if stock_id is None:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
     if start_date >= end_date:
@@ -81,7 +91,7 @@ def run_backtest(
     try:
         if benchmark_return is not None:
             result = BacktestService.compare_to_benchmark(
-                stock_id=stock.id,
+                stock_id=stock_id,
                 start_date=start_date,
                 end_date=end_date,
                 benchmark_return=benchmark_return,
@@ -89,7 +99,7 @@ def run_backtest(
             )
         else:
             result = BacktestService.calculate_signal_performance(
-                stock_id=stock.id,
+                stock_id=stock_id,
                 start_date=start_date,
                 end_date=end_date,
                 db=db,
@@ -97,7 +107,10 @@ def run_backtest(
 
         return SuccessResponse(
             data=result,
-            meta=Meta(timestamp=datetime.utcnow()),
+            meta=Meta(timestamp=request.state.now),
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error running backtest: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Error running backtest: {str(e)}")
+    except SQLAlchemyError:
+        logger.exception("Database error running backtest for %s", symbol)
+        raise HTTPException(status_code=503, detail="Database unavailable")
@@ -1,144 +1,178 @@
 """Market API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Enum as SAEnum, func, literal, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from typing import Optional
-from datetime import datetime
-from app.database import get_db
+import orjson
+from app.database import get_async_db
 from app.models.stock import Stock, Market, AssetType
 from app.models.signal import Signal, SignalType
-from app.schemas.stock import StockResponse, StockListResponse
-from app.schemas.signal import SignalResponse, SignalListResponse
+from app.schemas.stock import StockListResponse
+from app.schemas.signal import SignalListResponse, SIGNAL_LIST_ADAPTER
 from app.schemas.common import SuccessResponse, Meta
-from app.services.cache import cache_service
-
-router = APIRouter()
+from app.services.cache import cache_service, payload_etag
+from app.api.responses import (
+    serialize_envelope,
+    serialize_list_envelope,
+    json_response,
+    cached_json_response,
+    etag_matches,
+    not_modified_response,
+    validator_headers,
+)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Optional (migration-dependent) columns, resolved once at import
+_HAS_ASSET_TYPE = "asset_type" in Stock.__table__.columns
+_HAS_STOCK_TYPE = "stock_type" in Stock.__table__.columns
+
+# Columns backing StockResponse (in schema field order), selected as plain rows
+# so they can be encoded straight to JSON without ORM or pydantic objects
+_STOCK_RESPONSE_COLUMNS = (
+    Stock.id,
+    Stock.symbol,
+    Stock.name,
+    Stock.market,
+    Stock.sector,
+    Stock.currency,
+    Stock.asset_type if _HAS_ASSET_TYPE else literal(AssetType.STOCK, SAEnum(AssetType)).label("asset_type"),
+    Stock.stock_type if _HAS_STOCK_TYPE else null().label("stock_type"),
+    Stock.is_active,
+    Stock.created_at,
+)
+
+# Static cache-key prefixes per market, built once at import
+_STOCKS_KEY = {m: f"market_stocks:{m.value}" for m in Market}
+_HIGHLIGHTS_KEY = {m: f"market_highlights:{m.value}" for m in Market}
 
 
 @router.get("/{market}/stocks", response_model=SuccessResponse)
-def get_market_stocks(
+async def get_market_stocks(
     market: Market,
+    request: Request,
     asset_type: Optional[AssetType] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all stocks/ETFs/Mutual Funds for a specific market."""
     # Build cache key
-    cache_key = f"market_stocks:{market.value}"
-    if asset_type:
-        cache_key += f":{asset_type.value}"
-    
-    cached = cache_service.get(cache_key)
-    if cached:
-        return SuccessResponse(
-            data=cached,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=True),
+    cache_key = _STOCKS_KEY[market] + (":" + asset_type.value if asset_type else "")
+
+    # Answer revalidation from the stored ETag alone
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await cache_service.get_etag_async(cache_key)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+
+    items = []
+    total = 0
+
+    async def load() -> bytes:
+        nonlocal total
+        stmt = select(*_STOCK_RESPONSE_COLUMNS).where(Stock.market == market, Stock.is_active == True)
+
+        # Only filter by asset_type if column exists (migration applied)
+        if asset_type and _HAS_ASSET_TYPE:
+            stmt = stmt.where(Stock.asset_type == asset_type)
+
+        # Encode rows batch by batch off a server-side cursor; rows come straight
+        # from our own table, so the StockResponse shape needs no re-validation
+        result = await db.stream(stmt.execution_options(yield_per=500))
+        async for partition in result.mappings().partitions():
+            items.extend(orjson.dumps(dict(row), option=orjson.OPT_UTC_Z) for row in partition)
+        total = len(items)
+
+        return serialize_list_envelope(
+            items, _stock_list(total), Meta(timestamp=request.state.now, cache_hit=True), for_cache=True
         )
 
-    query = db.query(Stock).filter(Stock.market == market, Stock.is_active == True)
-    
-    # Only filter by asset_type if column exists (migration applied)
-    if asset_type:
-        try:
-            # Check if asset_type column exists by trying to access it
-            # If column doesn't exist, this will fail gracefully
-            test_stock = db.query(Stock).first()
-            if test_stock and hasattr(test_stock, 'asset_type'):
-                query = query.filter(Stock.asset_type == asset_type)
-            # If column doesn't exist, ignore the filter (all stocks returned)
-        except Exception:
-            # Column doesn't exist, ignore asset_type filter
-            pass
-    
-    stocks = query.all()
-
-    # Safely serialize stocks, handling missing columns gracefully
-    stock_items = []
-    for stock in stocks:
-        try:
-            stock_dict = {
-                "id": stock.id,
-                "symbol": stock.symbol,
-                "name": stock.name,
-                "market": stock.market,
-                "sector": stock.sector,
-                "currency": stock.currency,
-                "is_active": stock.is_active,
-                "created_at": stock.created_at,
-            }
-            # Only include asset_type if column exists (migration applied)
-            if hasattr(stock, 'asset_type'):
-                stock_dict["asset_type"] = stock.asset_type
-            else:
-                stock_dict["asset_type"] = AssetType.STOCK
-            # Only include stock_type if column exists (migration applied)
-            if hasattr(stock, 'stock_type'):
-                stock_dict["stock_type"] = stock.stock_type
-            else:
-                stock_dict["stock_type"] = None
-            stock_items.append(StockResponse.model_validate(stock_dict))
-        except Exception as e:
-            # Log error but continue with other stocks
-            print(f"Warning: Error serializing stock {stock.symbol}: {e}")
-            continue
-
-    result = StockListResponse(
-        items=stock_items,
-        total=len(stock_items),
-        page=1,
-        page_size=len(stock_items),
+    # Cache the serialized envelope for 1 hour; concurrent misses share one query
+    payload, hit = await cache_service.get_or_compute(cache_key, 3600, load)
+    etag = payload_etag(payload)
+    if hit:
+        return cached_json_response(payload, etag, request.state.now)
+
+    return json_response(
+        serialize_list_envelope(
+            items, _stock_list(total), Meta(timestamp=request.state.now, cache_hit=False)
+        ),
+        etag,
     )
 
-    # Cache for 1 hour
-    cache_service.set(cache_key, result.model_dump(), 3600)
 
-    return SuccessResponse(
-        data=result,
-        meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
-    )
+def _stock_list(total: int) -> StockListResponse:
+    """Single-page list envelope for pre-encoded stock items."""
+    return StockListResponse(items=[], total=total, page=1, page_size=total)
 
 
 @router.get("/{market}/highlights", response_model=SuccessResponse)
-def get_market_highlights(market: Market, db: Session = Depends(get_db)):
+async def get_market_highlights(
+    market: Market,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
     """Get market highlights (top movers, signals)."""
-    # Check cache
-    cache_key = f"market_highlights:{market.value}"
-    cached = cache_service.get(cache_key)
-    if cached:
-        return SuccessResponse(
-            data=cached,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=True),
+    cache_key = _HIGHLIGHTS_KEY[market]
+
+    # Answer revalidation from the stored ETag alone
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await cache_service.get_etag_async(cache_key)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+
+    result = None
+
+    async def load() -> bytes:
+        nonlocal result
+        # Rank BUY and SELL signals in one pass and keep the top 5 of each
+        ranked = (
+            select(
+                Signal,
+                func.row_number()
+                .over(partition_by=Signal.signal_type, order_by=Signal.confidence_score.desc())
+                .label("rn"),
+            )
+            .join(Stock)
+            .where(
+                Stock.market == market,
+                Stock.is_active == True,
+                Signal.signal_type.in_([SignalType.BUY, SignalType.SELL]),
+            )
+            .subquery()
         )
+        top_signal = aliased(Signal, ranked)
+        top_signals = (
+            await db.scalars(select(top_signal).where(ranked.c.rn <= 5).order_by(ranked.c.rn))
+        ).all()
 
-    # Get top BUY signals
-    top_buy_signals = (
-        db.query(Signal)
-        .join(Stock)
-        .filter(Stock.market == market, Stock.is_active == True, Signal.signal_type == SignalType.BUY)
-        .order_by(Signal.confidence_score.desc())
-        .limit(5)
-        .all()
-    )
+        top_signals = SIGNAL_LIST_ADAPTER.dump_python(
+            SIGNAL_LIST_ADAPTER.validate_python(top_signals, from_attributes=True)
+        )
 
-    # Get top SELL signals
-    top_sell_signals = (
-        db.query(Signal)
-        .join(Stock)
-        .filter(Stock.market == market, Stock.is_active == True, Signal.signal_type == SignalType.SELL)
-        .order_by(Signal.confidence_score.desc())
-        .limit(5)
-        .all()
-    )
+        result = {
+            "top_buy_signals": [s for s in top_signals if s["signal_type"] == SignalType.BUY],
+            "top_sell_signals": [s for s in top_signals if s["signal_type"] == SignalType.SELL],
+            "market": market.value,
+        }
+
+        return serialize_envelope(result, Meta(timestamp=request.state.now, cache_hit=True), for_cache=True)
 
-    result = {
-        "top_buy_signals": [SignalResponse.model_validate(s).model_dump() for s in top_buy_signals],
-        "top_sell_signals": [SignalResponse.model_validate(s).model_dump() for s in top_sell_signals],
-        "market": market.value,
-    }
+    # Cache the serialized envelope for 15 minutes (and in-process for a minute);
+    # concurrent misses share one query
+    payload, hit = await cache_service.get_or_compute(cache_key, 900, load, local=True)
+    etag = payload_etag(payload)
+    if hit:
+        return cached_json_response(payload, etag, request.state.now)
 
-    # Cache for 15 minutes
-    cache_service.set(cache_key, result, 900)
+    response.headers.update(validator_headers(etag))
 
     return SuccessResponse(
         data=result,
-        meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
+        meta=Meta(timestamp=request.state.now, cache_hit=False),
     )
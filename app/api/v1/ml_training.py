@@ -1,94 +1,123 @@
 """ML model training API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session
+from celery.result import AsyncResult
+from fastapi import APIRouter, Depends, HTTPException, Body, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
-from app.database import get_db
+import uuid
+from app.database import get_async_db
 from app.models.stock import Stock
 from app.schemas.common import SuccessResponse, Meta
-# Optional ML training imports
-try:
-    from app.ml.training import train_lstm_model, train_classifier_model
-    ML_TRAINING_AVAILABLE = True
-except ImportError:
-    ML_TRAINING_AVAILABLE = False
-    def train_lstm_model(*args, **kwargs):
-        raise HTTPException(status_code=503, detail="ML training not available. Install TensorFlow: pip install tensorflow")
-    def train_classifier_model(*args, **kwargs):
-        raise HTTPException(status_code=503, detail="ML training not available. Install TensorFlow: pip install tensorflow")
+from app.services.cache import cache_service
+from app.services.stock_lookup import resolve_stock_id
+from app.tasks.celery_app import celery_app
+# Training runs on Celery workers, which report missing TensorFlow in the job result
+from app.tasks.ml_training_tasks import (
+    ML_JOB_KEY,
+    record_job_progress,
+    train_lstm_for_stock,
+    train_classifier_model_task,
+)
 
 router = APIRouter()
 
 
-@router.post("/lstm/train", response_model=SuccessResponse)
-def train_lstm(
+@router.post("/lstm/train", response_model=SuccessResponse, status_code=202)
+async def train_lstm(
+    request: Request,
     symbol: str = Body(..., description="Stock symbol"),
     sequence_length: int = Body(60, description="LSTM sequence length"),
     epochs: int = Body(50, description="Training epochs"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Train LSTM model for price forecasting.
+    Queue LSTM model training for price forecasting.
 
     Requires sufficient historical data (at least 100+ days).
+    Returns a job ID to poll at /jobs/{job_id}.
     """
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
-    if not stock:
+    stock_id = await resolve_stock_id(db, symbol)
+    if stock_id is None:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
-    if not ML_TRAINING_AVAILABLE:
-        raise HTTPException(status_code=503, detail="ML training not available. Install TensorFlow: pip install tensorflow")
-    
-    try:
-        result = train_lstm_model(
-            stock_id=stock.id,
-            sequence_length=sequence_length,
-            epochs=epochs
-        )
-
-        return SuccessResponse(
-            data=result,
-            meta=Meta(timestamp=datetime.utcnow()),
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+    job_id = await _enqueue(train_lstm_for_stock, stock_id, sequence_length, epochs)
 
+    return SuccessResponse(
+        data={"job_id": job_id, "status": "queued"},
+        meta=Meta(timestamp=request.state.now),
+    )
 
-@router.post("/classifier/train", response_model=SuccessResponse)
-def train_classifier(
+
+@router.post("/classifier/train", response_model=SuccessResponse, status_code=202)
+async def train_classifier(
+    request: Request,
     stock_symbols: Optional[List[str]] = Body(None, description="Stock symbols to train on (None = all)"),
     epochs: int = Body(100, description="Training epochs"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Train signal classifier model.
+    Queue signal classifier model training.
 
     Uses historical signal data to learn BUY/HOLD/SELL patterns.
+    Returns a job ID to poll at /jobs/{job_id}.
     """
     stock_ids = None
     if stock_symbols:
-        stocks = db.query(Stock).filter(Stock.symbol.in_([s.upper() for s in stock_symbols])).all()
-        stock_ids = [s.id for s in stocks]
-        if not stock_ids:
-            raise HTTPException(status_code=404, detail="No stocks found")
-
-    if not ML_TRAINING_AVAILABLE:
-        raise HTTPException(status_code=503, detail="ML training not available. Install TensorFlow: pip install tensorflow")
-    
+        upper_syms = list(dict.fromkeys(s.upper() for s in stock_symbols))
+        rows = (
+            await db.execute(select(Stock.symbol, Stock.id).where(Stock.symbol.in_(upper_syms)))
+        ).all()
+        ids_by_symbol = {symbol: stock_id for symbol, stock_id in rows}
+        if len(ids_by_symbol) != len(upper_syms):
+            missing = [s for s in upper_syms if s not in ids_by_symbol]
+            raise HTTPException(status_code=404, detail=f"Stocks not found: {', '.join(missing)}")
+        stock_ids = list(ids_by_symbol.values())
+
+    job_id = await _enqueue(train_classifier_model_task, stock_ids=stock_ids, epochs=epochs)
+
+    return SuccessResponse(
+        data={"job_id": job_id, "status": "queued"},
+        meta=Meta(timestamp=request.state.now),
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=SuccessResponse)
+async def get_training_job(request: Request, job_id: str):
+    """
+    Get the status of a queued training job.
+
+    Returns the Celery task state, the last recorded progress stage and,
+    once finished, the training result or error.
+    """
+    progress = await cache_service.get_hash_async(ML_JOB_KEY.format(job_id=job_id))
+    result = AsyncResult(job_id, app=celery_app)
+    state = await run_in_threadpool(lambda: result.state)
+
+    # Celery reports unknown IDs as PENDING; only jobs we queued have progress
+    if state == "PENDING" and not progress:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    data = {"job_id": job_id, "state": state, "progress": progress}
+    if state == "SUCCESS":
+        data["result"] = result.result
+    elif state == "FAILURE":
+        data["error"] = str(result.result)
+
+    return SuccessResponse(
+        data=data,
+        meta=Meta(timestamp=request.state.now),
+    )
+
+
+async def _enqueue(task, *args, **kwargs) -> str:
+    """Queue a training task and record it as queued; 503 if the broker is down."""
+    # Record before sending so the worker's first update cannot be overwritten
+    job_id = str(uuid.uuid4())
+    await run_in_threadpool(record_job_progress, job_id, "queued")
     try:
-        result = train_classifier_model(
-            stock_ids=stock_ids,
-            epochs=epochs
-        )
-
-        return SuccessResponse(
-            data=result,
-            meta=Meta(timestamp=datetime.utcnow()),
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        await run_in_threadpool(task.apply_async, args=args, kwargs=kwargs, task_id=job_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Training queue unavailable: {str(e)}")
+    return job_id
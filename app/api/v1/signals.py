@@ -1,50 +1,89 @@
 """Signal API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from datetime import datetime
+from typing import Any, Dict, Optional, List
+from datetime import date, datetime, timezone
+from functools import lru_cache
 from app.database import get_db
 from app.models.stock import Stock, Market
 from app.models.signal import Signal, SignalHistory, SignalType
-from app.models.technical_indicator import TechnicalIndicator
-from app.models.fundamental import Fundamental
 from app.models.price import StockPrice
 from app.schemas.signal import SignalResponse, SignalListResponse
-from app.schemas.common import SuccessResponse, ErrorResponse, Meta
-from app.services.cache import cache_service
+from app.schemas.common import SuccessResponse, ErrorResponse, Meta, Symbol
+from app.services.cache import cache_service, payload_etag
 from app.services.signal_generator import SignalGenerator
 from app.services.investment_signal_generator import InvestmentSignalGenerator
 from app.services.ml_signal_generator import MLSignalGenerator
-from app.services.indicator_calculator import IndicatorCalculator
 from app.services.explanation_generator import ExplanationGenerator
 from app.services.data_fetcher import DataFetcher
 from app.config import settings
-import pandas as pd
-
-router = APIRouter()
+from app.api.v1._signal_common import _build_signal_context
+from app.tasks.signal_generation import (
+    generate_signal_task,
+    get_ml_generator,
+    SIGNAL_CACHE_KEY,
+    SIGNAL_REFRESH_KEY,
+)
+from app.api.responses import (
+    cached_json_response,
+    serialize_envelope,
+    etag_matches,
+    not_modified_response,
+    validator_headers,
+)
+from app.tasks.celery_app import celery_app
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Columns backing SignalResponse, selected as plain rows (no ORM hydration)
+_SIGNAL_RESPONSE_COLUMNS = (
+    Signal.id,
+    Signal.stock_id,
+    Signal.signal_type,
+    Signal.confidence_score,
+    Signal.risk_level,
+    Signal.holding_period,
+    Signal.explanation,
+    Signal.created_at,
+)
 
 
 @router.get("/{symbol}/signal", response_model=SuccessResponse)
 def get_stock_signal(
-    symbol: str,
+    request: Request,
+    response: Response,
+    symbol: Symbol,
     use_ml: bool = Query(True, description="Use ML models if available"),
     db: Session = Depends(get_db),
 ):
-    """Get current AI signal for a stock (with ML enhancement if available)."""
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    """
+    Get current AI signal for a stock (with ML enhancement if available).
+
+    A stale stored signal is returned with 202 while a Celery worker
+    regenerates it; only stocks without any signal are generated inline.
+    """
+    cache_key = SIGNAL_CACHE_KEY.format(symbol=symbol)
+
+    # Answer revalidation (polling clients) from the stored ETag alone
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = cache_service.get_etag(cache_key)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+
+    # Check cache (in-process tier first, so hot symbols skip Redis and the DB);
+    # the cached envelope is served as-is, only its timestamp is stamped
+    cached = cache_service.get_raw(cache_key, local=True)
+    if cached is not None:
+        return cached_json_response(cached, payload_etag(cached), request.state.now)
+
+    stock = db.query(Stock).filter(Stock.symbol == symbol).first()
     if not stock:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
-    # Check cache
-    cache_key = f"signal:{symbol}"
-    cached = cache_service.get(cache_key)
-    if cached:
-        return SuccessResponse(
-            data=cached,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=True),
-        )
-
     # Get latest signal from database
     latest_signal = (
         db.query(Signal)
@@ -55,26 +94,34 @@ def get_stock_signal(
 
     if latest_signal:
         # Check if signal is still fresh (within cache TTL)
-        signal_age = (datetime.utcnow() - latest_signal.created_at).total_seconds()
+        created_at = latest_signal.created_at
+        if created_at.tzinfo is None:
+            # SQLite hands back naive (UTC) timestamps
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        signal_age = (request.state.now - created_at).total_seconds()
         if signal_age < settings.redis_cache_ttl_signal:
             result = SignalResponse.model_validate(latest_signal)
-            cache_service.set(cache_key, result.model_dump(), settings.redis_cache_ttl_signal)
+            response.headers.update(validator_headers(_cache_signal(cache_key, result, request.state.now)))
             return SuccessResponse(
                 data=result,
-                meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
+                meta=Meta(timestamp=request.state.now, cache_hit=False),
             )
 
     # Check if we have sufficient price data before attempting generation
-    price_count = db.query(StockPrice).filter(StockPrice.stock_id == stock.id).count()
-    
-    if price_count < 20:
+    # Probe for a 20th bar instead of counting the whole (hypertable) history
+    prices_query = db.query(StockPrice.time).filter(StockPrice.stock_id == stock.id)
+    has_enough = prices_query.order_by(StockPrice.time.desc()).offset(19).limit(1).first() is not None
+
+    if not has_enough:
+        # Fewer than 20 rows exist, so a bounded fetch gives the exact count
+        price_count = len(prices_query.limit(20).all())
         # Not enough data - return latest signal if available, or suggest data fetch
         if latest_signal:
             result = SignalResponse.model_validate(latest_signal)
             return SuccessResponse(
                 data=result,
                 meta=Meta(
-                    timestamp=datetime.utcnow(),
+                    timestamp=request.state.now,
                     message=f"Using cached signal (insufficient price data: {price_count} records, need 20+)",
                 ),
             )
@@ -90,19 +137,25 @@ def get_stock_signal(
             },
         )
 
-    # Generate new signal if not cached or stale
-    # This would typically be done via Celery task, but we'll do it synchronously here
-    # In production, this should trigger a background task
+    # Stale signal: hand regeneration to a worker and serve the last known one
+    if latest_signal and _enqueue_signal_refresh(symbol, use_ml):
+        response.status_code = 202
+        return SuccessResponse(
+            data=SignalResponse.model_validate(latest_signal),
+            meta=Meta(timestamp=request.state.now, message="refresh_enqueued"),
+        )
+
+    # No signal yet (or broker unavailable): generate synchronously
     try:
         if use_ml:
             signal_data = _generate_signal_for_stock_with_ml(stock, db)
         else:
             signal_data = _generate_signal_for_stock(stock, db)
         result = SignalResponse.model_validate(signal_data)
-        cache_service.set(cache_key, result.model_dump(), settings.redis_cache_ttl_signal)
+        response.headers.update(validator_headers(_cache_signal(cache_key, result, request.state.now)))
         return SuccessResponse(
             data=result,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
+            meta=Meta(timestamp=request.state.now, cache_hit=False),
         )
     except Exception as e:
         # If generation fails, return the latest signal from DB if available
@@ -112,7 +165,7 @@ def get_stock_signal(
             return SuccessResponse(
                 data=result,
                 meta=Meta(
-                    timestamp=datetime.utcnow(),
+                    timestamp=request.state.now,
                     message=f"Using cached signal (generation failed: {str(e)})",
                 ),
             )
@@ -125,11 +178,12 @@ def get_stock_signal(
 
 @router.post("/generate", response_model=SuccessResponse)
 def generate_signal(
-    symbol: str = Body(..., description="Stock symbol"),
+    request: Request,
+    symbol: Symbol = Body(..., description="Stock symbol"),
     db: Session = Depends(get_db),
 ):
     """Generate signal for a stock (admin/internal endpoint)."""
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    stock = db.query(Stock).filter(Stock.symbol == symbol).first()
     if not stock:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
@@ -138,7 +192,7 @@ def generate_signal(
         result = SignalResponse.model_validate(signal_data)
         return SuccessResponse(
             data=result,
-            meta=Meta(timestamp=datetime.utcnow()),
+            meta=Meta(timestamp=request.state.now),
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating signal: {str(e)}")
@@ -146,350 +200,215 @@ def generate_signal(
 
 @router.get("/top", response_model=SuccessResponse)
 def get_top_signals(
-    market: Optional[str] = Query(None, description="Filter by market (US or NGX)"),
+    request: Request,
+    market: Optional[Market] = Query(None, description="Filter by market (US or NGX)"),
     signal_type: Optional[SignalType] = Query(None, description="Filter by signal type"),
     limit: int = Query(10, ge=1, le=100, description="Number of top signals"),
     db: Session = Depends(get_db),
 ):
     """Get top signals today by confidence score."""
     # Check cache
-    cache_key = f"top_signals:{market}:{signal_type}:{limit}"
-    cached = cache_service.get(cache_key)
-    if cached:
-        return SuccessResponse(
-            data=cached,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=True),
+    cache_key = f"top_signals_envelope:{market}:{signal_type}:{limit}"
+    cached = cache_service.get_raw(cache_key, local=True)
+    if cached is not None:
+        return cached_json_response(cached, timestamp=request.state.now)
+
+    # Today's signals for active stocks, ranked per stock so only the latest counts
+    ranked = (
+        select(
+            *_SIGNAL_RESPONSE_COLUMNS,
+            func.row_number()
+            .over(partition_by=Signal.stock_id, order_by=Signal.created_at.desc())
+            .label("rn"),
         )
-
-    query = db.query(Signal).join(Stock).filter(Stock.is_active == True)
+        .join(Stock)
+        .where(
+            Stock.is_active == True,
+            Signal.created_at >= _day_start(request.state.now.date()),
+        )
+    )
 
     if market:
-        # Convert string to Market enum if needed
-        try:
-            if isinstance(market, str):
-                market_enum = Market[market.upper()]
-            else:
-                market_enum = market
-            query = query.filter(Stock.market == market_enum)
-        except (KeyError, AttributeError):
-            # Invalid market value, skip filter
-            pass
-    if signal_type:
-        query = query.filter(Signal.signal_type == signal_type)
+        ranked = ranked.where(Stock.market == market)
 
-    # Get today's signals
-    today = datetime.utcnow().date()
-    query = query.filter(Signal.created_at >= datetime.combine(today, datetime.min.time()))
+    ranked = ranked.subquery()
+    stmt = select(*(ranked.c[column.key] for column in _SIGNAL_RESPONSE_COLUMNS)).where(ranked.c.rn == 1)
+    if signal_type:
+        # Filter on each stock's latest signal, not on earlier ones from today
+        stmt = stmt.where(ranked.c.signal_type == signal_type)
 
-    signals = query.order_by(Signal.confidence_score.desc()).limit(limit).all()
+    signals = db.execute(stmt.order_by(ranked.c.confidence_score.desc()).limit(limit)).mappings().all()
 
+    # Rows come straight from the signals table in SignalResponse shape, so
+    # they need no re-validation
     result = SignalListResponse(
-        items=[SignalResponse.model_validate(signal) for signal in signals],
+        items=[SignalResponse.model_construct(**row) for row in signals],
         total=len(signals),
     )
 
-    # Cache for 15 minutes
-    cache_service.set(cache_key, result.model_dump(), 900)
+    # Cache the whole envelope for 15 minutes
+    cache_service.set_raw(
+        cache_key,
+        serialize_envelope(result, Meta(timestamp=request.state.now, cache_hit=True), for_cache=True),
+        900,
+    )
 
     return SuccessResponse(
         data=result,
-        meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
+        meta=Meta(timestamp=request.state.now, cache_hit=False),
     )
 
 
 @router.get("/{symbol}/history", response_model=SuccessResponse)
 def get_signal_history(
-    symbol: str,
+    request: Request,
+    symbol: Symbol,
     limit: int = Query(50, ge=1, le=200, description="Number of historical signals"),
     db: Session = Depends(get_db),
 ):
     """Get historical signals for a stock (for backtesting)."""
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
-    if not stock:
+    stock_id = db.execute(select(Stock.id).where(Stock.symbol == symbol)).scalar_one_or_none()
+    if stock_id is None:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
-    history = (
-        db.query(SignalHistory)
-        .filter(SignalHistory.stock_id == stock.id)
+    rows = db.execute(
+        select(
+            SignalHistory.id,
+            SignalHistory.stock_id,
+            SignalHistory.signal_type,
+            SignalHistory.confidence_score,
+            SignalHistory.created_at,
+        )
+        .where(SignalHistory.stock_id == stock_id)
         .order_by(SignalHistory.created_at.desc())
         .limit(limit)
-        .all()
-    )
+    ).all()
 
-    # Convert to dict format since SignalHistory has different fields
+    # Build plain dicts straight from the column tuples (SignalHistory has different fields)
     history_data = [
         {
-            "id": h.id,
-            "stock_id": h.stock_id,
-            "signal_type": h.signal_type.value,
-            "confidence_score": h.confidence_score,
-            "created_at": h.created_at,
+            "id": history_id,
+            "stock_id": history_stock_id,
+            "signal_type": signal_type.value,
+            "confidence_score": confidence_score,
+            "created_at": created_at,
         }
-        for h in history
+        for history_id, history_stock_id, signal_type, confidence_score, created_at in rows
     ]
 
     return SuccessResponse(
         data=history_data,
-        meta=Meta(timestamp=datetime.utcnow()),
+        meta=Meta(timestamp=request.state.now),
     )
 
 
-def _generate_signal_for_stock(stock: Stock, db: Session) -> Signal:
-    """Internal function to generate signal for a stock."""
-    # Try to get price data from database first (faster, no network calls)
-    prices = (
-        db.query(StockPrice)
-        .filter(StockPrice.stock_id == stock.id)
-        .order_by(StockPrice.time.desc())
-        .limit(200)
-        .all()
-    )
-    
-    if not prices or len(prices) < 20:
-        raise ValueError(f"Insufficient price data in database for {stock.symbol} ({len(prices) if prices else 0} records, need 20+)")
-    
-    # Use database data (fast, no network delay)
-    prices_df = pd.DataFrame(
-        [
-            {
-                "time": p.time,
-                "open": p.open,
-                "high": p.high,
-                "low": p.low,
-                "close": p.close,
-                "volume": p.volume,
-            }
-            for p in prices
-        ]
-    )
-    prices_df = prices_df.sort_values("time")
-    # Keep time as column (not index) for compatibility with indicator calculator
+@lru_cache(maxsize=1)
+def _day_start(day: date) -> datetime:
+    """Midnight at the start of a day (memoized; the single entry rolls over daily)."""
+    return datetime.combine(day, datetime.min.time())
 
-    # Calculate indicators
-    indicators = IndicatorCalculator.calculate_all_indicators(prices_df)
 
-    # Get latest technical indicator from DB or calculate
-    latest_indicator = (
-        db.query(TechnicalIndicator)
-        .filter(TechnicalIndicator.stock_id == stock.id)
-        .order_by(TechnicalIndicator.date.desc())
-        .first()
+def _cache_signal(cache_key: str, result: SignalResponse, timestamp: Optional[datetime] = None) -> str:
+    """
+    Cache a signal's full response envelope, ready to serve on a hit; returns its ETag.
+
+    The cached envelope carries a timestamp placeholder, so ``timestamp`` only
+    needs to be a valid time; request handlers pass their request time rather
+    than reading the clock again.
+    """
+    payload = serialize_envelope(
+        result,
+        Meta(timestamp=timestamp or datetime.now(timezone.utc), cache_hit=True),
+        for_cache=True,
     )
+    cache_service.set_raw(cache_key, payload, settings.redis_cache_ttl_signal)
+    return payload_etag(payload)
 
-    if latest_indicator:
-        # Use DB indicators if available
-        indicators.update(
-            {
-                "rsi": latest_indicator.rsi,
-                "macd": latest_indicator.macd,
-                "macd_signal": latest_indicator.macd_signal,
-                "macd_histogram": latest_indicator.macd_histogram,
-                "sma_20": latest_indicator.sma_20,
-                "sma_50": latest_indicator.sma_50,
-                "sma_200": latest_indicator.sma_200,
-                "ema_12": latest_indicator.ema_12,
-                "ema_26": latest_indicator.ema_26,
-                "bollinger_upper": latest_indicator.bollinger_upper,
-                "bollinger_lower": latest_indicator.bollinger_lower,
-                "volume_avg": latest_indicator.volume_avg,
-            }
-        )
 
-    # Get fundamentals
-    fundamental = (
-        db.query(Fundamental)
-        .filter(Fundamental.stock_id == stock.id)
-        .order_by(Fundamental.date.desc())
-        .first()
-    )
+def _enqueue_signal_refresh(symbol: str, use_ml: bool) -> bool:
+    """
+    Queue background regeneration of a stock's signal.
 
-    fundamentals_dict = {}
-    if fundamental:
-        fundamentals_dict = {
-            "revenue": fundamental.revenue,
-            "eps": fundamental.eps,
-            "pe_ratio": fundamental.pe_ratio,
-            "debt_ratio": fundamental.debt_ratio,
-            "earnings_growth": fundamental.earnings_growth,
-            "dividend_yield": fundamental.dividend_yield,
-            "dividend_per_share": fundamental.dividend_per_share,
-            "dividend_payout_ratio": fundamental.dividend_payout_ratio,
-        }
-        
-        # Classify stock and update if needed
-        from app.services.stock_classifier import StockClassifier
-        from app.models.stock import StockType
-        
-        stock_type = StockClassifier.classify_stock(
-            dividend_yield=fundamental.dividend_yield,
-            earnings_growth=fundamental.earnings_growth,
-            pe_ratio=fundamental.pe_ratio,
-            dividend_payout_ratio=fundamental.dividend_payout_ratio,
-        )
-        
-        # Update stock classification
-        if stock.stock_type != stock_type:
-            stock.stock_type = stock_type
-            db.commit()
+    At most one refresh per symbol is queued at a time.
+
+    Args:
+        symbol: Stock symbol (also used for the cache key)
+        use_ml: Use ML models if available
+
+    Returns:
+        True if a refresh is queued or already in flight, False if the broker is unavailable
+    """
+    refresh_key = SIGNAL_REFRESH_KEY.format(symbol=symbol)
+    if not cache_service.claim(refresh_key, celery_app.conf.task_time_limit):
+        return True
+
+    try:
+        # No publish retries: fall back to inline generation rather than block
+        generate_signal_task.apply_async((symbol, use_ml), retry=False)
+        return True
+    except Exception:
+        cache_service.delete(refresh_key)
+        return False
+
+
+def _generate_signal_for_stock(stock: Stock, db: Session) -> Dict[str, Any]:
+    """Internal function to generate signal for a stock."""
+    context = _build_signal_context(stock, db)
 
     # Generate investment signal (optimized for long-term investing, not trading)
     signal_result = InvestmentSignalGenerator.generate_investment_signal(
-        indicators=indicators,
-        fundamentals=fundamentals_dict,
-        prices_df=prices_df,
+        indicators=context.indicators,
+        fundamentals=context.fundamentals_dict,
+        prices_df=context.prices_df,
     )
     
     # Investment signal generator already includes investment-focused explanation
     explanation = signal_result.get("explanation", {})
     
     # Add stock classification and investor recommendations
-    if fundamental:
+    if context.stock_type:
         from app.services.stock_classifier import StockClassifier
-        from app.models.stock import StockType
-        
-        stock_type = stock.stock_type or StockClassifier.classify_stock(
-            dividend_yield=fundamental.dividend_yield,
-            earnings_growth=fundamental.earnings_growth,
-            pe_ratio=fundamental.pe_ratio,
-            dividend_payout_ratio=fundamental.dividend_payout_ratio,
-        )
-        
+
         investor_recommendation = StockClassifier.get_investor_recommendation(
-            stock_type=stock_type,
+            stock_type=context.stock_type,
             signal_type=signal_result["signal_type"].value,
         )
         
         explanation["stock_classification"] = {
-            "stock_type": stock_type.value,
+            "stock_type": context.stock_type.value,
             "investor_recommendation": investor_recommendation,
         }
 
-    # Create signal record
-    signal = Signal(
-        stock_id=stock.id,
-        signal_type=signal_result["signal_type"],
-        confidence_score=signal_result["confidence_score"],
-        risk_level=signal_result["risk_level"],
-        holding_period=signal_result["holding_period"],
-        explanation=explanation,
-    )
+    return _save_signal(stock, signal_result, explanation, db)
 
-    db.add(signal)
-    db.commit()
-    db.refresh(signal)
 
-    # Create history record
-    history = SignalHistory(
-        signal_id=signal.id,
-        stock_id=stock.id,
-        signal_type=signal.signal_type,
-        confidence_score=signal.confidence_score,
-    )
-    db.add(history)
-    db.commit()
-
-    return signal
-
-
-def _generate_signal_for_stock_with_ml(stock: Stock, db: Session) -> Signal:
+def _generate_signal_for_stock_with_ml(
+    stock: Stock, db: Session, ml_generator: Optional[MLSignalGenerator] = None
+) -> Dict[str, Any]:
     """Internal function to generate signal using ML models."""
-    # Get price data from database (fast, no network calls)
-    # Pre-check already validated we have enough data
-    prices = (
-        db.query(StockPrice)
-        .filter(StockPrice.stock_id == stock.id)
-        .order_by(StockPrice.time.desc())
-        .limit(200)
-        .all()
-    )
-    
-    if not prices or len(prices) < 20:
-        raise ValueError(f"Insufficient price data in database for {stock.symbol} ({len(prices) if prices else 0} records, need 20+)")
-    
-    # Use database data (fast, no network delay)
-    prices_df = pd.DataFrame(
-        [
-            {
-                "time": p.time,
-                "open": p.open,
-                "high": p.high,
-                "low": p.low,
-                "close": p.close,
-                "volume": p.volume,
-            }
-            for p in prices
-        ]
-    )
-    prices_df = prices_df.sort_values("time")
-    # Keep time as column (not index) for compatibility with indicator calculator
-
-    # Calculate indicators
-    indicators = IndicatorCalculator.calculate_all_indicators(prices_df)
+    context = _build_signal_context(stock, db)
+    indicators = context.indicators
 
-    # Get latest technical indicator from DB or calculate
-    latest_indicator = (
-        db.query(TechnicalIndicator)
-        .filter(TechnicalIndicator.stock_id == stock.id)
-        .order_by(TechnicalIndicator.date.desc())
-        .first()
-    )
+    # Use the process-wide ML generator so loaded models are reused across calls
+    if ml_generator is None:
+        ml_generator = get_ml_generator()
 
-    if latest_indicator:
-        # Use DB indicators if available
-        indicators.update(
-            {
-                "rsi": latest_indicator.rsi,
-                "macd": latest_indicator.macd,
-                "macd_signal": latest_indicator.macd_signal,
-                "macd_histogram": latest_indicator.macd_histogram,
-                "sma_20": latest_indicator.sma_20,
-                "sma_50": latest_indicator.sma_50,
-                "sma_200": latest_indicator.sma_200,
-                "ema_12": latest_indicator.ema_12,
-                "ema_26": latest_indicator.ema_26,
-                "bollinger_upper": latest_indicator.bollinger_upper,
-                "bollinger_lower": latest_indicator.bollinger_lower,
-                "volume_avg": latest_indicator.volume_avg,
-            }
-        )
-
-    # Get fundamentals
-    fundamental = (
-        db.query(Fundamental)
-        .filter(Fundamental.stock_id == stock.id)
-        .order_by(Fundamental.date.desc())
-        .first()
-    )
-
-    fundamentals_dict = {}
-    if fundamental:
-        fundamentals_dict = {
-            "revenue": fundamental.revenue,
-            "eps": fundamental.eps,
-            "pe_ratio": fundamental.pe_ratio,
-            "debt_ratio": fundamental.debt_ratio,
-            "earnings_growth": fundamental.earnings_growth,
-        }
-
-    # Use ML signal generator
-    ml_generator = MLSignalGenerator(use_lstm=True, use_classifier=True, fallback_to_rules=True)
-    
     signal_result = ml_generator.generate_signal_with_ml(
         symbol=stock.symbol,
         indicators=indicators,
-        fundamentals=fundamentals_dict,
-        prices_df=prices_df,
+        fundamentals=context.fundamentals_dict,
+        prices_df=context.prices_df,
     )
 
     # Enhance explanation
-    current_price = prices_df["close"].iloc[-1]
+    current_price = context.prices_df["close"].iloc[-1]
     technical_data = {
         "score": 50,
         "trend": "bullish" if signal_result["signal_type"].value == "BUY" else "bearish",
     }
     fundamental_data = {
         "score": 50,
-        **fundamentals_dict,
+        **context.fundamentals_dict,
     }
     trend_data = {"score": 50}
     volatility_data = {"score": 50}
@@ -512,28 +431,43 @@ def _generate_signal_for_stock_with_ml(stock: Stock, db: Session) -> Signal:
         explanation["ml_prediction"] = signal_result["explanation"].get("ml_prediction")
         explanation["hybrid_approach"] = True
 
-    # Create signal record
-    signal = Signal(
-        stock_id=stock.id,
-        signal_type=signal_result["signal_type"],
-        confidence_score=signal_result["confidence_score"],
-        risk_level=signal_result["risk_level"],
-        holding_period=signal_result["holding_period"],
-        explanation=explanation,
-    )
+    return _save_signal(stock, signal_result, explanation, db)
 
-    db.add(signal)
-    db.commit()
-    db.refresh(signal)
+
+def _save_signal(stock: Stock, signal_result: dict, explanation: dict, db: Session) -> Dict[str, Any]:
+    """
+    Persist a generated signal together with its history record.
+
+    Both rows are written with Core INSERTs (the signal's id and created_at
+    come back via RETURNING) and, along with anything else pending on the
+    session such as a stock reclassification, committed once.
+
+    Returns:
+        The stored signal as a dict in SignalResponse shape
+    """
+    values = {
+        "stock_id": stock.id,
+        "signal_type": signal_result["signal_type"],
+        "confidence_score": signal_result["confidence_score"],
+        "risk_level": signal_result["risk_level"],
+        "holding_period": signal_result["holding_period"],
+        "explanation": explanation,
+    }
+
+    # Create signal record
+    signal_id, created_at = db.execute(
+        insert(Signal).values(**values).returning(Signal.id, Signal.created_at)
+    ).one()
 
     # Create history record
-    history = SignalHistory(
-        signal_id=signal.id,
-        stock_id=stock.id,
-        signal_type=signal.signal_type,
-        confidence_score=signal.confidence_score,
+    db.execute(
+        insert(SignalHistory).values(
+            signal_id=signal_id,
+            stock_id=stock.id,
+            signal_type=values["signal_type"],
+            confidence_score=values["confidence_score"],
+        )
     )
-    db.add(history)
     db.commit()
 
-    return signal
+    return {"id": signal_id, **values, "created_at": created_at}
@@ -1,183 +1,280 @@
 """Stock API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import Optional, List
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload
+from typing import Optional
 from datetime import datetime, date
-from app.database import get_db
+import orjson
+from celery import chain, group
+from app.database import get_db, get_async_db
 from app.models.stock import Stock, Market, AssetType
 from app.models.price import StockPrice
 from app.models.fundamental import Fundamental
 from app.models.technical_indicator import TechnicalIndicator
-from app.schemas.stock import StockResponse, StockListResponse, StockCreate
-from app.schemas.price import PriceResponse, PriceListResponse
+from app.schemas.stock import StockResponse, StockListResponse, StockCreate, STOCK_LIST_ADAPTER
+from app.schemas.price import PriceListResponse
 from app.schemas.fundamental import FundamentalResponse
-from app.schemas.technical_indicator import TechnicalIndicatorResponse
-from app.schemas.common import SuccessResponse, ErrorResponse, Meta
+from app.schemas.technical_indicator import TECHNICAL_INDICATOR_LIST_ADAPTER
+from app.schemas.common import SuccessResponse, Meta
 from app.services.cache import cache_service
-from app.config import settings
+from app.services.stock_lookup import estimated_stock_count, resolve_stock_identifier
+from app.api.responses import (
+    json_response,
+    serialize_envelope,
+    serialize_list_envelope,
+)
 from app.tasks.data_ingestion import fetch_stock_prices, update_fundamentals, calculate_indicators
-from app.services.data_fetcher import DataFetcher
+from app.services.data_fetcher import DataFetcher, yahoo_breaker
+from app.config import settings
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Optional (migration-dependent) column, resolved once at import
+_HAS_ASSET_TYPE = "asset_type" in Stock.__table__.columns
+
+# Dialect INSERTs supporting ON CONFLICT (Postgres in production, SQLite in tests)
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+# How long keyset-paginated listings reuse a filter's total count (seconds)
+STOCK_COUNT_TTL = 60
+
+# Columns backing PriceResponse, selected as plain rows (no ORM hydration)
+_PRICE_RESPONSE_COLUMNS = (
+    StockPrice.time,
+    StockPrice.stock_id,
+    StockPrice.open,
+    StockPrice.high,
+    StockPrice.low,
+    StockPrice.close,
+    StockPrice.volume,
+)
+
+
+async def resolve_stock(identifier: str, db: AsyncSession = Depends(get_async_db)) -> StockResponse:
+    """
+    Resolve the ``{identifier}`` path parameter (stock ID or symbol) to a stock.
+
+    Args:
+        identifier: Numeric stock ID or symbol (any case)
+        db: Async database session
+
+    Returns:
+        The stock's response fields (cached, so not an ORM instance)
 
-router = APIRouter()
+    Raises:
+        HTTPException: 404 if no stock matches
+    """
+    stock = await resolve_stock_identifier(db, identifier)
+    if not stock:
+        raise HTTPException(status_code=404, detail=f"Stock {identifier} not found")
+    return stock
 
 
 @router.get("", response_model=SuccessResponse)
-def list_stocks(
+async def list_stocks(
+    request: Request,
     market: Optional[Market] = Query(None, description="Filter by market"),
     sector: Optional[str] = Query(None, description="Filter by sector"),
     asset_type: Optional[AssetType] = Query(None, description="Filter by asset type (STOCK, ETF, MUTUAL_FUND)"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
+    cursor: Optional[int] = Query(
+        None, ge=0, description="ID of the last stock on the previous page (next_cursor); overrides page"
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """List all stocks/ETFs/Mutual Funds with pagination and filters."""
-    query = db.query(Stock).filter(Stock.is_active == True)
+    """
+    List all stocks/ETFs/Mutual Funds with pagination and filters.
+
+    Stocks are ordered by ID. Passing the previous page's ``next_cursor`` as
+    ``cursor`` seeks straight to the next page instead of skipping rows.
+    """
+    filters = [Stock.is_active == True]
+    # StockResponse only reads columns; fail loudly rather than lazy-load a relationship per row
+    no_relationships = raiseload("*")
 
     if market:
-        query = query.filter(Stock.market == market)
+        filters.append(Stock.market == market)
     if sector:
-        query = query.filter(Stock.sector == sector)
-    
-    # Only filter by asset_type if column exists (migration applied)
-    if asset_type:
-        try:
-            # Check if asset_type column exists
-            test_stock = db.query(Stock).first()
-            if test_stock and hasattr(test_stock, 'asset_type'):
-                query = query.filter(Stock.asset_type == asset_type)
-            # If column doesn't exist, ignore the filter
-        except Exception:
-            # Column doesn't exist, ignore asset_type filter
-            pass
-
-    total = query.count()
-    offset = (page - 1) * page_size
-    stocks = query.offset(offset).limit(page_size).all()
-
-    # Safely serialize stocks, handling missing stock_type column gracefully
-    stock_items = []
-    for stock in stocks:
-        try:
-            stock_dict = {
-                "id": stock.id,
-                "symbol": stock.symbol,
-                "name": stock.name,
-                "market": stock.market,
-                "sector": stock.sector,
-                "currency": stock.currency,
-                "is_active": stock.is_active,
-                "created_at": stock.created_at,
-            }
-            # Only include stock_type if column exists (migration applied)
-            if hasattr(stock, 'stock_type'):
-                stock_dict["stock_type"] = stock.stock_type
-            else:
-                stock_dict["stock_type"] = None
-            stock_items.append(StockResponse.model_validate(stock_dict))
-        except Exception as e:
-            # Log error but continue with other stocks
-            print(f"Warning: Error serializing stock {stock.symbol}: {e}")
-            continue
+        filters.append(Stock.sector == sector)
 
-    return SuccessResponse(
-        data=StockListResponse(
-            items=stock_items,
-            total=total,
-            page=page,
-            page_size=page_size,
-        ),
-        meta=Meta(
-            timestamp=datetime.utcnow(),
-            page=page,
-            page_size=page_size,
-            total=total,
-        ),
+    # Only filter by asset_type if column exists (migration applied)
+    if asset_type and _HAS_ASSET_TYPE:
+        filters.append(Stock.asset_type == asset_type)
+
+    # Without a selective filter an exact count scans the whole table; very
+    # large tables report the statistics estimate instead
+    unfiltered = len(filters) == 1
+    estimate = await estimated_stock_count(db) if unfiltered else None
+
+    if cursor is not None:
+        # Keyset page: seek past the cursor on the primary key index; the
+        # window count would only cover the remaining rows, so the total is
+        # counted separately (and cached briefly, as paging clients repeat it)
+        rows = (
+            await db.execute(
+                select(Stock)
+                .options(no_relationships)
+                .where(*filters, Stock.id > cursor)
+                .order_by(Stock.id)
+                .limit(page_size)
+            )
+        ).all()
+        stocks = [row[0] for row in rows]
+        count_key = f"stock_count:{market}:{sector}:{asset_type}"
+        total = estimate if estimate is not None else await cache_service.get_async(count_key, local=True)
+        if total is None:
+            total = await db.scalar(select(func.count()).select_from(Stock).where(*filters))
+            await cache_service.set_async(count_key, total, STOCK_COUNT_TTL)
+    elif estimate is not None:
+        stocks = (
+            await db.scalars(
+                select(Stock)
+                .options(no_relationships)
+                .where(*filters)
+                .order_by(Stock.id)
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+            )
+        ).all()
+        total = estimate
+    else:
+        # The total rides along on every row (COUNT(*) OVER ()), so one statement
+        # returns both the page and the number of matching stocks
+        offset = (page - 1) * page_size
+        rows = (
+            await db.execute(
+                select(Stock, func.count().over().label("total"))
+                .options(no_relationships)
+                .where(*filters)
+                .order_by(Stock.id)
+                .offset(offset)
+                .limit(page_size)
+            )
+        ).all()
+        stocks = [row[0] for row in rows]
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # Past the last page there is no row to carry the total
+            total = await db.scalar(select(func.count()).select_from(Stock).where(*filters))
+        else:
+            total = 0
+    next_cursor = stocks[-1].id if len(stocks) == page_size else None
+
+    stock_items = STOCK_LIST_ADAPTER.validate_python(stocks, from_attributes=True)
+
+    # Encode once with orjson rather than via the response model and encoder
+    return json_response(
+        serialize_envelope(
+            StockListResponse(
+                items=stock_items,
+                total=total,
+                page=page,
+                page_size=page_size,
+                next_cursor=next_cursor,
+            ),
+            Meta(
+                timestamp=request.state.now,
+                page=page,
+                page_size=page_size,
+                total=total,
+            ),
+        )
     )
 
 
 @router.post("", response_model=SuccessResponse, status_code=201)
-def create_stock(stock_data: StockCreate, db: Session = Depends(get_db)):
+async def create_stock(request: Request, stock_data: StockCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new stock and automatically trigger data fetching."""
-    # Check if stock already exists
-    existing = db.query(Stock).filter(Stock.symbol == stock_data.symbol.upper()).first()
-    if existing:
-        raise HTTPException(status_code=400, detail=f"Stock {stock_data.symbol} already exists")
-
     # Fetch asset info from API for US assets
     name = stock_data.name
     sector = stock_data.sector
     asset_type = stock_data.asset_type or AssetType.STOCK
     
-    if stock_data.market == Market.US:
+    # Skip the lookup entirely while Yahoo Finance keeps failing
+    if stock_data.market == Market.US and yahoo_breaker.allow():
         try:
-            info = DataFetcher.fetch_us_stock_info(stock_data.symbol)
-            if info:
-                name = info.get("name") or info.get("longName") or name
-                sector = info.get("sector") or sector
-                # Auto-detect asset type if not provided
-                if not stock_data.asset_type:
-                    detected_type = info.get("asset_type", "STOCK")
-                    try:
-                        asset_type = AssetType[detected_type]
-                    except (KeyError, ValueError):
-                        asset_type = AssetType.STOCK
-        except Exception:
-            pass  # Use provided values if fetch fails
-
-    # Create stock/ETF/Mutual Fund
-    stock = Stock(
-        symbol=stock_data.symbol.upper(),
-        name=name,
-        market=stock_data.market,
-        sector=sector,
-        currency=stock_data.currency,
-        asset_type=asset_type,
-        is_active=stock_data.is_active,
+            # Blocking network call; keep it off the event loop and bound the wait
+            info = await asyncio.wait_for(
+                run_in_threadpool(DataFetcher.fetch_us_stock_info, stock_data.symbol),
+                timeout=settings.yfinance_info_timeout,
+            )
+        except asyncio.TimeoutError:
+            info = None  # Use provided values if fetch is slow
+        if info:
+            yahoo_breaker.record_success()
+            name = info.get("name") or info.get("longName") or name
+            sector = info.get("sector") or sector
+            # Auto-detect asset type if not provided
+            if not stock_data.asset_type:
+                detected_type = info.get("asset_type", "STOCK")
+                try:
+                    asset_type = AssetType[detected_type]
+                except (KeyError, ValueError):
+                    asset_type = AssetType.STOCK
+        else:
+            yahoo_breaker.record_failure()
+
+    # Create stock/ETF/Mutual Fund; an existing symbol makes the insert a no-op,
+    # so the duplicate check and the insert are one atomic statement
+    insert = _UPSERT_INSERTS[db.bind.dialect.name]
+    stock = await db.scalar(
+        insert(Stock)
+        .values(
+            symbol=stock_data.symbol.upper(),
+            name=name,
+            market=stock_data.market,
+            sector=sector,
+            currency=stock_data.currency,
+            asset_type=asset_type,
+            is_active=stock_data.is_active,
+        )
+        .on_conflict_do_nothing(index_elements=[Stock.symbol])
+        .returning(Stock)
     )
-    db.add(stock)
-    db.commit()
-    db.refresh(stock)
+    if stock is None:
+        raise HTTPException(status_code=400, detail=f"Stock {stock_data.symbol} already exists")
+    await db.commit()
 
-    # Automatically trigger data fetching in background
+    # Automatically trigger data fetching in background (publishing blocks on the broker)
     try:
-        fetch_stock_prices.delay(stock.symbol, stock.market.value)
-        update_fundamentals.delay(stock.symbol)
-        calculate_indicators.delay(stock.symbol)
+        await run_in_threadpool(_queue_data_fetch, stock.symbol, stock.market.value)
     except Exception as e:
         # Log error but don't fail the request
         print(f"Warning: Failed to queue data fetch tasks for {stock.symbol}: {e}")
 
-    # Safely serialize stock, handling missing columns
-    stock_dict = {
-        "id": stock.id,
-        "symbol": stock.symbol,
-        "name": stock.name,
-        "market": stock.market,
-        "sector": stock.sector,
-        "currency": stock.currency,
-        "is_active": stock.is_active,
-        "created_at": stock.created_at,
-    }
-    # Only include asset_type if column exists (migration applied)
-    if hasattr(stock, 'asset_type'):
-        stock_dict["asset_type"] = stock.asset_type
-    else:
-        stock_dict["asset_type"] = AssetType.STOCK
-    # Only include stock_type if column exists (migration applied)
-    if hasattr(stock, 'stock_type'):
-        stock_dict["stock_type"] = stock.stock_type
-    else:
-        stock_dict["stock_type"] = None
-    
     return SuccessResponse(
-        data=StockResponse.model_validate(stock_dict),
-        meta=Meta(timestamp=datetime.utcnow()),
+        data=StockResponse.model_validate(stock),
+        meta=Meta(timestamp=request.state.now),
     )
 
 
+def _queue_data_fetch(symbol: str, market: str) -> None:
+    """
+    Queue price, fundamentals and indicator ingestion for a new stock.
+
+    Published as one group; indicators are chained after the price fetch
+    since they are computed from the stored prices.
+    """
+    group(
+        chain(fetch_stock_prices.si(symbol, market), calculate_indicators.si(symbol)),
+        update_fundamentals.si(symbol),
+    ).apply_async()
+
+
 @router.get("/{identifier}", response_model=SuccessResponse)
-def get_stock(identifier: str, db: Session = Depends(get_db)):
+async def get_stock(request: Request, stock: StockResponse = Depends(resolve_stock)):
     """
     Get stock details by symbol or ID.
     
@@ -185,181 +282,117 @@ def get_stock(identifier: str, db: Session = Depends(get_db)):
     - GET /api/v1/stocks/AAPL (by symbol)
     - GET /api/v1/stocks/1 (by ID)
     """
-    # Try to parse as integer ID first
-    try:
-        stock_id = int(identifier)
-        stock = db.query(Stock).filter(Stock.id == stock_id).first()
-    except ValueError:
-        # Not an integer, treat as symbol
-        stock = db.query(Stock).filter(Stock.symbol == identifier.upper()).first()
-    
-    if not stock:
-        raise HTTPException(status_code=404, detail=f"Stock {identifier} not found")
-
-    # Safely serialize stock, handling missing columns
-    stock_dict = {
-        "id": stock.id,
-        "symbol": stock.symbol,
-        "name": stock.name,
-        "market": stock.market,
-        "sector": stock.sector,
-        "currency": stock.currency,
-        "is_active": stock.is_active,
-        "created_at": stock.created_at,
-    }
-    # Only include asset_type if column exists (migration applied)
-    if hasattr(stock, 'asset_type'):
-        stock_dict["asset_type"] = stock.asset_type
-    else:
-        stock_dict["asset_type"] = AssetType.STOCK
-    # Only include stock_type if column exists (migration applied)
-    if hasattr(stock, 'stock_type'):
-        stock_dict["stock_type"] = stock.stock_type
-    else:
-        stock_dict["stock_type"] = None
-    
     return SuccessResponse(
-        data=StockResponse.model_validate(stock_dict),
-        meta=Meta(timestamp=datetime.utcnow()),
+        data=stock,
+        meta=Meta(timestamp=request.state.now),
     )
 
 
 @router.get("/{identifier}/prices", response_model=SuccessResponse)
-def get_stock_prices(
-    identifier: str,
+async def get_stock_prices(
+    request: Request,
+    stock: StockResponse = Depends(resolve_stock),
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Get OHLCV price data for a stock (by symbol or ID)."""
-    # Try to parse as integer ID first
-    try:
-        stock_id = int(identifier)
-        stock = db.query(Stock).filter(Stock.id == stock_id).first()
-    except ValueError:
-        # Not an integer, treat as symbol
-        stock = db.query(Stock).filter(Stock.symbol == identifier.upper()).first()
-    
-    if not stock:
-        raise HTTPException(status_code=404, detail=f"Stock {identifier} not found")
-
-    # Check cache (use symbol for cache key)
-    cache_key = f"stock_prices:{stock.symbol}:{start_date}:{end_date}:{limit}"
-    cached = cache_service.get(cache_key)
-    if cached:
-        return SuccessResponse(
-            data=cached,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=True),
-        )
+    """
+    Get OHLCV price data for a stock (by symbol or ID).
 
-    query = db.query(StockPrice).filter(StockPrice.stock_id == stock.id)
+    Responses are cached by ResponseCacheMiddleware.
+    """
+    # Lambda statements are built and compiled once per shape; later calls only
+    # bind new values (closure variables, so never attributes of the request)
+    stock_id = stock.id
+    stmt = lambda_stmt(lambda: select(*_PRICE_RESPONSE_COLUMNS).where(StockPrice.stock_id == stock_id))
 
     if start_date:
-        query = query.filter(StockPrice.time >= datetime.combine(start_date, datetime.min.time()))
+        start = datetime.combine(start_date, datetime.min.time())
+        stmt += lambda s: s.where(StockPrice.time >= start)
     if end_date:
-        query = query.filter(StockPrice.time <= datetime.combine(end_date, datetime.max.time()))
-
-    prices = query.order_by(StockPrice.time.desc()).limit(limit).all()
-
-    result = PriceListResponse(
-        items=[PriceResponse.model_validate(price) for price in prices],
-        total=len(prices),
-    )
-
-    # Cache result
-    cache_service.set(cache_key, result.model_dump(), settings.redis_cache_ttl_price)
-
-    return SuccessResponse(
-        data=result,
-        meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
+        end = datetime.combine(end_date, datetime.max.time())
+        stmt += lambda s: s.where(StockPrice.time <= end)
+    stmt += lambda s: s.order_by(StockPrice.time.desc()).limit(limit)
+
+    # Encode rows batch by batch off a server-side cursor; the selected columns
+    # are exactly PriceResponse's, so rows need no model round trip. Options go
+    # to stream(): .execution_options() on a lambda statement drops its bound values
+    items = []
+    result = await db.stream(stmt, execution_options={"yield_per": 200})
+    async for partition in result.mappings().partitions():
+        items.extend(orjson.dumps(dict(row), option=orjson.OPT_UTC_Z) for row in partition)
+    data = PriceListResponse(items=[], total=len(items))
+
+    return json_response(
+        serialize_list_envelope(items, data, Meta(timestamp=request.state.now, cache_hit=False))
     )
 
 
 @router.get("/{identifier}/fundamentals", response_model=SuccessResponse)
-def get_stock_fundamentals(identifier: str, db: Session = Depends(get_db)):
-    """Get latest fundamental data for a stock (by symbol or ID)."""
-    # Try to parse as integer ID first
-    try:
-        stock_id = int(identifier)
-        stock = db.query(Stock).filter(Stock.id == stock_id).first()
-    except ValueError:
-        # Not an integer, treat as symbol
-        stock = db.query(Stock).filter(Stock.symbol == identifier.upper()).first()
-    
-    if not stock:
-        raise HTTPException(status_code=404, detail=f"Stock {identifier} not found")
+async def get_stock_fundamentals(
+    request: Request,
+    stock: StockResponse = Depends(resolve_stock),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get latest fundamental data for a stock (by symbol or ID).
 
-    # Check cache (use symbol for cache key)
-    cache_key = f"stock_fundamentals:{stock.symbol}"
-    cached = cache_service.get(cache_key)
-    if cached:
-        return SuccessResponse(
-            data=cached,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=True),
+    Responses are cached by ResponseCacheMiddleware.
+    """
+    stock_id = stock.id
+    fundamental = await db.scalar(
+        lambda_stmt(
+            lambda: select(Fundamental)
+            .where(Fundamental.stock_id == stock_id)
+            .order_by(Fundamental.date.desc())
+            .limit(1)
         )
-
-    fundamental = (
-        db.query(Fundamental)
-        .filter(Fundamental.stock_id == stock.id)
-        .order_by(Fundamental.date.desc())
-        .first()
     )
 
     if not fundamental:
-        # Return empty response instead of 404
-        return SuccessResponse(
-            data=None,
-            meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
-        )
+        # Return empty response instead of 404; not cached, as ingestion may be pending
+        response = json_response(serialize_envelope(None, Meta(timestamp=request.state.now, cache_hit=False)))
+        response.headers["Cache-Control"] = "no-store"
+        return response
 
     result = FundamentalResponse.model_validate(fundamental)
 
-    # Cache result
-    cache_service.set(cache_key, result.model_dump(), settings.redis_cache_ttl_fundamental)
-
-    return SuccessResponse(
-        data=result,
-        meta=Meta(timestamp=datetime.utcnow(), cache_hit=False),
-    )
+    # Encode once with orjson rather than via the response model and encoder
+    return json_response(serialize_envelope(result, Meta(timestamp=request.state.now, cache_hit=False)))
 
 
 @router.get("/{identifier}/indicators", response_model=SuccessResponse)
-def get_stock_indicators(
-    identifier: str,
+async def get_stock_indicators(
+    request: Request,
+    stock: StockResponse = Depends(resolve_stock),
     limit: int = Query(30, ge=1, le=100, description="Number of recent indicators"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get technical indicators for a stock (by symbol or ID)."""
-    # Try to parse as integer ID first
-    try:
-        stock_id = int(identifier)
-        stock = db.query(Stock).filter(Stock.id == stock_id).first()
-    except ValueError:
-        # Not an integer, treat as symbol
-        stock = db.query(Stock).filter(Stock.symbol == identifier.upper()).first()
-    
-    if not stock:
-        raise HTTPException(status_code=404, detail=f"Stock {identifier} not found")
-
     indicators = (
-        db.query(TechnicalIndicator)
-        .filter(TechnicalIndicator.stock_id == stock.id)
-        .order_by(TechnicalIndicator.date.desc())
-        .limit(limit)
-        .all()
-    )
+        await db.scalars(
+            select(TechnicalIndicator)
+            .where(TechnicalIndicator.stock_id == stock.id)
+            .order_by(TechnicalIndicator.date.desc())
+            .limit(limit)
+        )
+    ).all()
 
     # Return empty array if no indicators (don't return 404)
-    return SuccessResponse(
-        data=[TechnicalIndicatorResponse.model_validate(ind) for ind in indicators],
-        meta=Meta(timestamp=datetime.utcnow()),
+    return json_response(
+        serialize_envelope(
+            TECHNICAL_INDICATOR_LIST_ADAPTER.validate_python(indicators, from_attributes=True),
+            Meta(timestamp=request.state.now),
+        )
     )
 
 
 @router.get("/{identifier}/signal", response_model=SuccessResponse)
 def get_stock_signal_from_stocks(
-    identifier: str,
+    request: Request,
+    response: Response,
+    stock: StockResponse = Depends(resolve_stock),
     use_ml: bool = Query(True, description="Use ML models if available"),
     db: Session = Depends(get_db),
 ):
@@ -368,24 +401,15 @@ def get_stock_signal_from_stocks(
     Matches frontend expectation: /api/v1/stocks/{identifier}/signal
     Delegates to signals endpoint.
     """
-    # Resolve identifier to symbol
-    try:
-        stock_id = int(identifier)
-        stock = db.query(Stock).filter(Stock.id == stock_id).first()
-    except ValueError:
-        stock = db.query(Stock).filter(Stock.symbol == identifier.upper()).first()
-    
-    if not stock:
-        raise HTTPException(status_code=404, detail=f"Stock {identifier} not found")
-    
     # Import here to avoid circular dependency
     from app.api.v1 import signals
-    return signals.get_stock_signal(stock.symbol, use_ml, db)
+    return signals.get_stock_signal(request, response, stock.symbol, use_ml, db)
 
 
 @router.get("/{identifier}/backtest", response_model=SuccessResponse)
 def get_stock_backtest_from_stocks(
-    identifier: str,
+    request: Request,
+    stock: StockResponse = Depends(resolve_stock),
     start_date: Optional[date] = Query(None, description="Start date (default: 1 year ago)"),
     end_date: Optional[date] = Query(None, description="End date (default: today)"),
     db: Session = Depends(get_db),
@@ -395,16 +419,6 @@ def get_stock_backtest_from_stocks(
     Matches frontend expectation: /api/v1/stocks/{identifier}/backtest
     Delegates to backtest endpoint.
     """
-    # Resolve identifier to symbol
-    try:
-        stock_id = int(identifier)
-        stock = db.query(Stock).filter(Stock.id == stock_id).first()
-    except ValueError:
-        stock = db.query(Stock).filter(Stock.symbol == identifier.upper()).first()
-    
-    if not stock:
-        raise HTTPException(status_code=404, detail=f"Stock {identifier} not found")
-    
     # Import here to avoid circular dependency
     from app.api.v1 import backtest
-    return backtest.get_backtest_performance(stock.symbol, start_date, end_date, db)
+    return backtest.get_backtest_performance(request, stock.symbol, start_date, end_date, db)
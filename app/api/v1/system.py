@@ -1,85 +1,152 @@
 """System health and diagnostic API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from datetime import datetime
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import distinct, exists, func, select, text
 from typing import Dict, Any, Optional
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_async_db
 from app.models.stock import Stock
+from app.models.price import StockPrice
+from app.models.fundamental import Fundamental
 from app.schemas.common import SuccessResponse, Meta
 from app.config import settings
 from app.services.cache import cache_service
+from app.services.stock_lookup import estimated_stock_count
+from app.api.responses import json_response, serialize_envelope
 
 router = APIRouter()
 
+# All stock coverage counts in one row (one round trip, no ORM entities)
+_STOCK_COUNTS = select(
+    func.count().label("total"),
+    func.count().filter(Stock.is_active == True).label("active"),
+    select(func.count(distinct(StockPrice.stock_id))).scalar_subquery().label("with_prices"),
+    select(func.count(distinct(Fundamental.stock_id))).scalar_subquery().label("with_fundamentals"),
+).select_from(Stock)
+
+# Sample stocks with their price/fundamental coverage computed in SQL (per-stock
+# subqueries on the stock_id indexes) instead of loading both collections
+_SAMPLE_STOCKS = select(
+    Stock.id,
+    Stock.symbol,
+    Stock.name,
+    Stock.market,
+    select(func.count())
+    .where(StockPrice.stock_id == Stock.id)
+    .scalar_subquery()
+    .label("price_records"),
+    exists().where(Fundamental.stock_id == Stock.id).label("has_fundamentals"),
+    Stock.is_active,
+).limit(10)
+
+# Celery inspect broadcasts to issue together for the status report
+_CELERY_INSPECTIONS = ("active", "scheduled", "registered")
+_inspect_executor = ThreadPoolExecutor(max_workers=len(_CELERY_INSPECTIONS), thread_name_prefix="celery-inspect")
+
+
+def _inspect_celery() -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Run the Celery worker inspections concurrently.
+
+    Each broadcast waits up to settings.healthcheck_celery_timeout for
+    replies, so the report takes one timeout rather than one per inspection
+    when no workers answer.
+
+    Returns:
+        Inspection name -> replies by worker (None if no worker replied)
+    """
+    from app.tasks.celery_app import celery_app
+
+    def run(name: str) -> Optional[Dict[str, Any]]:
+        inspect = celery_app.control.inspect(timeout=settings.healthcheck_celery_timeout)
+        return getattr(inspect, name)()
+
+    return dict(zip(_CELERY_INSPECTIONS, _inspect_executor.map(run, _CELERY_INSPECTIONS)))
+
 
 @router.get("/health")
-def health_check():
+def health_check(request: Request):
     """Basic health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    return {"status": "healthy", "timestamp": request.state.now.isoformat()}
+
+
+async def _ping_database() -> None:
+    """Round-trip a trivial query on a fresh session."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+
+
+async def _count_stocks() -> Dict[str, int]:
+    """Stock coverage counts for the status report."""
+    async with AsyncSessionLocal() as db:
+        return dict((await db.execute(_STOCK_COUNTS)).one()._mapping)
+
+
+def _ping_cache() -> bool:
+    """Write, read back and delete a key in Redis."""
+    test_key = "health_check_test"
+    cache_service.set(test_key, "test", 10)
+    cached = cache_service.get(test_key)
+    cache_service.delete(test_key)
+    return cached == "test"
 
 
 @router.get("/system/status", response_model=SuccessResponse)
-def get_system_status(db: Session = Depends(get_db)):
+async def get_system_status(request: Request):
     """
     Get system status including database, cache, and background jobs.
+
+    The probes run concurrently (database probes on the async engine, the
+    blocking Redis and Celery probes in threads), so the report takes as long
+    as the slowest one rather than their sum.
     """
+    database, cache, stocks, inspections = await asyncio.gather(
+        _ping_database(),
+        asyncio.to_thread(_ping_cache),
+        _count_stocks(),
+        asyncio.to_thread(_inspect_celery),
+        return_exceptions=True,
+    )
+
     status: Dict[str, Any] = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": request.state.now.isoformat(),
         "database": {},
         "cache": {},
         "stocks": {},
         "background_jobs": {},
     }
-    
+
     # Check database connection
-    try:
-        db.execute(text("SELECT 1"))
-        status["database"]["connected"] = True
-        status["database"]["error"] = None
-    except Exception as e:
-        status["database"]["connected"] = False
-        status["database"]["error"] = str(e)
-    
+    if isinstance(database, Exception):
+        status["database"] = {"connected": False, "error": str(database)}
+    else:
+        status["database"] = {"connected": True, "error": None}
+
     # Check cache (Redis)
-    try:
-        test_key = "health_check_test"
-        cache_service.set(test_key, "test", 10)
-        cached = cache_service.get(test_key)
-        cache_service.delete(test_key)
-        status["cache"]["connected"] = cached == "test"
-        status["cache"]["error"] = None
-    except Exception as e:
-        status["cache"]["connected"] = False
-        status["cache"]["error"] = str(e)
-    
+    if isinstance(cache, Exception):
+        status["cache"] = {"connected": False, "error": str(cache)}
+    else:
+        status["cache"] = {"connected": cache, "error": None}
+
     # Check stocks in database
-    try:
-        total_stocks = db.query(Stock).count()
-        active_stocks = db.query(Stock).filter(Stock.is_active == True).count()
-        stocks_with_prices = db.query(Stock).join(Stock.prices).distinct().count()
-        stocks_with_fundamentals = db.query(Stock).join(Stock.fundamentals).distinct().count()
-        
-        status["stocks"] = {
-            "total": total_stocks,
-            "active": active_stocks,
-            "with_prices": stocks_with_prices,
-            "with_fundamentals": stocks_with_fundamentals,
+    if isinstance(stocks, Exception):
+        status["stocks"]["error"] = str(stocks)
+    else:
+        status["stocks"] = stocks
+
+    # Check Celery configuration (inspection fails if workers aren't running)
+    if isinstance(inspections, Exception):
+        status["background_jobs"] = {
+            "celery_configured": True,
+            "workers_active": False,
+            "error": str(inspections),
         }
-    except Exception as e:
-        status["stocks"]["error"] = str(e)
-    
-    # Check Celery configuration
-    try:
-        from app.tasks.celery_app import celery_app
-        
-        # Try to inspect active workers (this may fail if workers aren't running)
-        inspect = celery_app.control.inspect()
-        active_workers = inspect.active()
-        scheduled = inspect.scheduled()
-        registered = inspect.registered()
-        
+    else:
+        active_workers = inspections["active"]
+        scheduled = inspections["scheduled"]
+        registered = inspections["registered"]
         status["background_jobs"] = {
             "celery_configured": True,
             "broker_url": settings.celery_broker_url[:20] + "..." if settings.celery_broker_url else None,
@@ -89,40 +156,25 @@ def get_system_status(db: Session = Depends(get_db)):
             "registered_tasks": len(registered.get(list(registered.keys())[0], [])) if registered else 0,
             "error": None,
         }
-    except Exception as e:
-        status["background_jobs"] = {
-            "celery_configured": True,
-            "workers_active": False,
-            "error": str(e),
-        }
-    
-    return SuccessResponse(
-        data=status,
-        meta=Meta(timestamp=datetime.utcnow()),
-    )
+
+    # Cached briefly by ResponseCacheMiddleware, which expects orjson-encoded envelopes
+    return json_response(serialize_envelope(status, Meta(timestamp=request.state.now)))
 
 
 @router.get("/system/stocks/sample")
-def get_sample_stocks(db: Session = Depends(get_db)):
+async def get_sample_stocks(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get a sample of stocks to verify data exists."""
-    stocks = db.query(Stock).limit(10).all()
-    
-    result = []
-    for stock in stocks:
-        price_count = len(stock.prices) if stock.prices else 0
-        has_fundamentals = stock.fundamentals is not None and len(stock.fundamentals) > 0
-        
-        result.append({
-            "id": stock.id,
-            "symbol": stock.symbol,
-            "name": stock.name,
-            "market": stock.market.value if stock.market else None,
-            "price_records": price_count,
-            "has_fundamentals": has_fundamentals,
-            "is_active": stock.is_active,
-        })
-    
-    return SuccessResponse(
-        data={"stocks": result, "total_in_db": db.query(Stock).count()},
-        meta=Meta(timestamp=datetime.utcnow()),
+    result = [
+        {**row._mapping, "market": row.market.value if row.market else None}
+        for row in await db.execute(_SAMPLE_STOCKS)
+    ]
+
+    # Large tables report the statistics estimate instead of a full COUNT(*)
+    total = await estimated_stock_count(db)
+    if total is None:
+        total = await db.scalar(select(func.count()).select_from(Stock))
+
+    # Cached briefly by ResponseCacheMiddleware, which expects orjson-encoded envelopes
+    return json_response(
+        serialize_envelope({"stocks": result, "total_in_db": total}, Meta(timestamp=request.state.now))
     )
@@ -1,5 +1,6 @@
 """Application configuration settings."""
 
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
 from typing import List
 import os
@@ -11,16 +12,22 @@ class Settings(BaseSettings):
     # Database
     database_url: str
     timescaledb_enabled: bool = True
+    db_slow_query_ms: int = 100  # Log statements slower than this
+    # Create missing tables at app startup. The Alembic history only alters
+    # tables, so fresh databases still rely on this; existing tables are untouched
+    auto_create_schema: bool = True
 
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     redis_cache_ttl_signal: int = 3600  # 1 hour
     redis_cache_ttl_price: int = 300  # 5 minutes
     redis_cache_ttl_fundamental: int = 86400  # 24 hours
+    redis_cache_ttl_status: int = 5  # Seconds; dashboards poll /system/status
 
     # Celery
     celery_broker_url: str = "redis://localhost:6379/1"
     celery_result_backend: str = "redis://localhost:6379/2"
+    healthcheck_celery_timeout: float = 0.5  # Seconds to wait for worker inspect replies
 
     # API Settings
     api_v1_prefix: str = "/api/v1"
@@ -32,10 +39,18 @@ class Settings(BaseSettings):
     # Data Sources
     # Yahoo Finance (yfinance) - Primary and only data source
     yfinance_enabled: bool = True
+    yfinance_info_timeout: float = 1.5  # Seconds create_stock waits for asset info
     # NGX support disabled - no API available
     ngx_api_enabled: bool = False
     ngx_api_url: str = ""
 
+    # Machine Learning
+    # Compile the signal classifier with XLA (jit_compile). Input shapes are
+    # fixed at build time, so it compiles once; off by default as not every
+    # device supports XLA. The LSTM never uses it (its cuDNN kernel cannot be
+    # XLA-compiled)
+    ml_xla_enabled: bool = False
+
     # Environment
     environment: str = "development"
     debug: bool = True
@@ -47,9 +62,9 @@ class Settings(BaseSettings):
     # OpenAI (for future use - enhanced explanations, sentiment analysis)
     openai_api_key: str = ""
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
-        """Parse CORS origins from comma-separated string."""
+        """Parse CORS origins from comma-separated string (once per settings instance)."""
         # Handle both CORS_ORIGINS and CORS_ORIGIN (for Railway compatibility)
         cors_value = getattr(self, 'cors_origins', None) or os.getenv('CORS_ORIGIN', '')
         # Remove trailing commas and empty strings
@@ -61,4 +76,10 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Process-wide settings, loaded once (tests can reset with get_settings.cache_clear())."""
+    return Settings()
+
+
+settings = get_settings()
@@ -1,16 +1,26 @@
 """Database connection and session management."""
 
+import logging
+import time
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import Request
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Create database engine with memory-efficient pool settings
+# (used by Celery tasks, scripts and services that work with a sync Session)
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
     pool_size=5,  # Reduced for Railway/memory efficiency
     max_overflow=10,  # Reduced for Railway/memory efficiency
+    pool_timeout=10,  # Fail fast instead of queueing 30s when the pool is exhausted
     pool_recycle=3600,  # Recycle connections after 1 hour
     echo=False,  # Disable SQL logging to save memory
 )
@@ -18,20 +28,67 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for each sync backend used in settings.database_url
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_database_url(database_url: str):
+    """Map the configured (sync) database URL onto its asyncio driver."""
+    url = make_url(database_url)
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+# Async engine for API routes: a persistent pool shared by all concurrent requests
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    poolclass=AsyncAdaptedQueuePool,
+    pool_pre_ping=True,
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=10,
+    pool_recycle=3600,  # Recycle connections after 1 hour
+    echo=False,
+)
+
+# Async session factory (no expiry on commit so responses can be built after commit)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+
+def _log_slow_queries(sync_engine) -> None:
+    """Log statements on an engine that run longer than settings.db_slow_query_ms."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _check_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_start) * 1000
+        if elapsed_ms > settings.db_slow_query_ms:
+            logger.warning("Slow query (%.0f ms): %s", elapsed_ms, statement)
+
+
+_log_slow_queries(engine)
+_log_slow_queries(async_engine.sync_engine)
+
 # Base class for models
 Base = declarative_base()
 
 
+def get_db(request: Request) -> Session:
+    """Dependency for the request's database session (opened by DBSessionMiddleware)."""
+    return request.state.db
 
 
-def get_db():
-    """Dependency for getting database session."""
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+async def get_async_db():
+    """Dependency for getting an async database session."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
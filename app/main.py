@@ -1,18 +1,31 @@
 """FastAPI main application."""
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 from app.config import settings
 from app.api.v1 import stocks, signals, markets, backtest, ml_training, system
-from app.database import Base, engine
+from app.api.middleware import DBSessionMiddleware, RequestTimeMiddleware, ResponseCacheMiddleware
+from app.database import Base, async_engine, engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create missing tables on startup; close pooled database connections on shutdown."""
+    if settings.auto_create_schema:
+        # Blocking DDL round trips; keep them off the event loop
+        try:
+            await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+        except SQLAlchemyError as e:
+            print(f"⚠️  Warning: Could not create database tables: {e}")
+            print("   Database may not exist yet. Run migrations: alembic upgrade head")
+    yield
+    await async_engine.dispose()
+    engine.dispose()
 
-# Create database tables (only if database exists)
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception as e:
-    print(f"⚠️  Warning: Could not create database tables: {e}")
-    print("   Database may not exist yet. Run migrations: alembic upgrade head")
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -21,6 +34,23 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+)
+
+# Per-request sync session (request.state.db) for routes on get_db; inside the
+# response cache, so cache hits never open one
+app.add_middleware(DBSessionMiddleware)
+
+# Read-through response cache for slow-changing GET routes (innermost, so
+# cached responses still pass through CORS)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    ttl_table={
+        f"{settings.api_v1_prefix}/stocks/*/prices": settings.redis_cache_ttl_price,
+        f"{settings.api_v1_prefix}/stocks/*/fundamentals": settings.redis_cache_ttl_fundamental,
+        f"{settings.api_v1_prefix}/system/system/status": settings.redis_cache_ttl_status,
+        f"{settings.api_v1_prefix}/system/system/stocks/sample": settings.redis_cache_ttl_status,
+    },
 )
 
 # CORS middleware
@@ -32,6 +62,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request timestamp (request.state.now) for response metadata
+app.add_middleware(RequestTimeMiddleware)
+
 # Include routers
 app.include_router(stocks.router, prefix=f"{settings.api_v1_prefix}/stocks", tags=["stocks"])
 app.include_router(signals.router, prefix=f"{settings.api_v1_prefix}/signals", tags=["signals"])
@@ -41,6 +74,16 @@ app.include_router(ml_training.router, prefix=f"{settings.api_v1_prefix}/ml", ta
 app.include_router(system.router, prefix=f"{settings.api_v1_prefix}/system", tags=["system"])
 
 
+def _check_unique_routes(application: FastAPI) -> None:
+    """Fail at startup if any path/method pair is registered more than once."""
+    seen = set()
+    for route in application.routes:
+        for method in getattr(route, "methods", None) or {"*"}:
+            if (route.path, method) in seen:
+                raise RuntimeError(f"Duplicate route registered: {method} {route.path}")
+            seen.add((route.path, method))
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
@@ -72,3 +115,7 @@ async def global_exception_handler(request, exc):
             },
         },
     )
+
+
+# Every route is registered by now
+_check_unique_routes(app)
@@ -1,16 +1,35 @@
 """ML models for signal generation."""
 
-# Optional imports - only import if TensorFlow is available
-try:
-    from app.ml.models import LSTMForecaster, SignalClassifier
-    from app.ml.training import train_lstm_model, train_classifier_model
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
-    LSTMForecaster = None
-    SignalClassifier = None
-    train_lstm_model = None
-    train_classifier_model = None
+import importlib
+import importlib.util
+import os
+
+# TensorFlow reads these when it is first imported: quiet its C++ info and
+# warning logs, and keep oneDNN's vectorized CPU kernels on unless overridden
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+
+# Checked without importing (and initializing) TensorFlow
+ML_AVAILABLE = importlib.util.find_spec("tensorflow") is not None
+
+# Public names resolved on first access (PEP 562), so importing app.ml, or a
+# submodule that does not need them, never pulls in TensorFlow
+_LAZY_ATTRS = {
+    "LSTMForecaster": "app.ml.models",
+    "SignalClassifier": "app.ml.models",
+    "train_lstm_model": "app.ml.training",
+    "train_classifier_model": "app.ml.training",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        # Optional imports - None when TensorFlow is not installed
+        if not ML_AVAILABLE:
+            return None
+        return getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "LSTMForecaster",
@@ -2,23 +2,61 @@
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Tuple, Optional, Dict, Any
 from sklearn.preprocessing import MinMaxScaler, StandardScaler
 import joblib
 import os
+from app.config import settings
 
 # Optional TensorFlow imports
 try:
+    import tensorflow as tf
     from tensorflow import keras
     from tensorflow.keras import layers, models
     TENSORFLOW_AVAILABLE = True
 except ImportError:
     TENSORFLOW_AVAILABLE = False
+    tf = None
     keras = None
     layers = None
     models = None
 
 
+def _lstm_kwargs() -> Dict[str, Any]:
+    """
+    LSTM settings that keep the layer eligible for the fused cuDNN kernel.
+
+    These are the Keras defaults, pinned so a later tweak (e.g. adding
+    recurrent_dropout) cannot silently drop training onto the generic kernel.
+    With a GPU present cuDNN is required, so an ineligible config fails loudly;
+    on CPU the layer falls back to the generic implementation.
+    """
+    has_gpu = bool(tf.config.list_physical_devices('GPU'))
+    return dict(
+        activation='tanh',
+        recurrent_activation='sigmoid',
+        recurrent_dropout=0.0,
+        unroll=False,
+        use_bias=True,
+        use_cudnn=True if has_gpu else 'auto',
+    )
+
+
+def _reset_training_state(model, initial_weights) -> None:
+    """Restore a model's freshly built weights and clear its optimizer state."""
+    model.set_weights(initial_weights)
+    for variable in model.optimizer.variables:
+        # Step count and moment estimates; the learning rate is configuration
+        if not variable.path.endswith('learning_rate'):
+            variable.assign(tf.zeros_like(variable))
+
+
+def _scaler_path(filepath: str) -> str:
+    """Return the scaler file stored alongside a model file."""
+    return os.path.splitext(filepath)[0] + '_scaler.pkl'
+
+
 class LSTMForecaster:
     """
     LSTM model for stock price forecasting.
@@ -42,6 +80,18 @@ class LSTMForecaster:
         self.model = None
         self.scaler = MinMaxScaler()
         self.is_trained = False
+        # Saved model path; load() defers reading the weights to first predict()
+        self._model_path = None
+        # Weights as built, restored by reset_weights()
+        self._initial_weights = None
+        # Fitted scaler terms (x * scale + min), cached for inference
+        self._scale = None
+        self._min = None
+
+    def _cache_scaling(self) -> None:
+        """Cache the fitted scaler's affine terms as plain arrays."""
+        self._scale = self.scaler.scale_.copy()
+        self._min = self.scaler.min_.copy()
 
     def build_model(self, units: int = 50, dropout: float = 0.2) -> keras.Model:
         """
@@ -54,10 +104,15 @@ class LSTMForecaster:
         Returns:
             Compiled Keras model
         """
+        lstm_kwargs = _lstm_kwargs()
+        # Dropout stays between the LSTM layers, which does not block cuDNN
         model = models.Sequential([
-            layers.LSTM(units, return_sequences=True, input_shape=(self.sequence_length, self.features)),
+            layers.LSTM(
+                units, return_sequences=True,
+                input_shape=(self.sequence_length, self.features), **lstm_kwargs
+            ),
             layers.Dropout(dropout),
-            layers.LSTM(units, return_sequences=False),
+            layers.LSTM(units, return_sequences=False, **lstm_kwargs),
             layers.Dropout(dropout),
             layers.Dense(25),
             layers.Dense(1)  # Predict next close price
@@ -66,12 +121,20 @@ class LSTMForecaster:
         model.compile(
             optimizer=keras.optimizers.Adam(learning_rate=0.001),
             loss='mse',
-            metrics=['mae']
+            metrics=['mae'],
+            # XLA cannot compile the cuDNN LSTM kernel pinned on GPU
+            jit_compile=False,
         )
 
         self.model = model
+        self._initial_weights = model.get_weights()
         return model
 
+    def reset_weights(self) -> None:
+        """Reset the built model to its initial weights for retraining from scratch."""
+        _reset_training_state(self.model, self._initial_weights)
+        self.is_trained = False
+
     def prepare_data(self, prices_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """
         Prepare data for LSTM training.
@@ -87,13 +150,17 @@ class LSTMForecaster:
 
         # Scale features
         scaled_features = self.scaler.fit_transform(features)
+        self._cache_scaling()
 
-        X, y = [], []
-        for i in range(self.sequence_length, len(scaled_features)):
-            X.append(scaled_features[i - self.sequence_length:i])
-            y.append(scaled_features[i, 3])  # Close price is at index 3
+        # Every window of sequence_length rows as a strided view (no per-window
+        # copies); the last window has no next close to predict, so it is dropped
+        windows = sliding_window_view(
+            scaled_features, (self.sequence_length, self.features)
+        )[:, 0]
+        X = np.ascontiguousarray(windows[:-1])
+        y = scaled_features[self.sequence_length:, 3]  # Close price is at index 3
 
-        return np.array(X), np.array(y)
+        return X, y
 
     def train(
         self,
@@ -147,56 +214,56 @@ class LSTMForecaster:
         Returns:
             Predicted prices
         """
+        if self.model is None and self._model_path:
+            self.model = keras.models.load_model(self._model_path)
         if not self.is_trained or self.model is None:
             raise ValueError("Model not trained. Call train() first.")
 
         if len(prices_df) < self.sequence_length:
             raise ValueError(f"Need at least {self.sequence_length} data points for prediction")
 
-        # Get last sequence
-        features = prices_df[['open', 'high', 'low', 'close', 'volume']].values
-        scaled_features = self.scaler.transform(features)
-        last_sequence = scaled_features[-self.sequence_length:].reshape(1, self.sequence_length, self.features)
+        # Get last sequence, scaled inline (same affine map as scaler.transform,
+        # without sklearn's per-call validation)
+        features = prices_df[['open', 'high', 'low', 'close', 'volume']].values[-self.sequence_length:]
 
-        predictions = []
-        current_sequence = last_sequence.copy()
+        # One float32 (the model's dtype) window buffer, shifted in place per step
+        current_sequence = np.empty((1, self.sequence_length, self.features), dtype=np.float32)
+        current_sequence[0] = features * self._scale + self._min
 
-        for _ in range(steps):
-            # Predict next step
-            pred = self.model.predict(current_sequence, verbose=0)
-            predictions.append(pred[0, 0])
+        predictions = np.empty(steps)
+
+        for step in range(steps):
+            # Predict next step; calling the model directly skips predict()'s
+            # per-call batching/callback setup, which dominates for one sample
+            pred = float(self.model(current_sequence, training=False)[0, 0])
+            predictions[step] = pred
 
             # Update sequence (simplified - in production, use actual next values)
             # For multi-step, we'd need to predict all features or use actual values
-            new_row = current_sequence[0, -1, :].copy()
-            new_row[3] = pred[0, 0]  # Update close price
-            current_sequence = np.append(
-                current_sequence[:, 1:, :],
-                new_row.reshape(1, 1, self.features),
-                axis=1
-            )
-
-        # Inverse transform predictions
-        # Create dummy array for inverse transform
-        dummy = np.zeros((len(predictions), self.features))
-        dummy[:, 3] = predictions
-        predictions_scaled = self.scaler.inverse_transform(dummy)[:, 3]
-
-        return predictions_scaled
+            new_row = current_sequence[0, -1].copy()
+            new_row[3] = pred  # Update close price
+            current_sequence[0, :-1] = current_sequence[0, 1:]
+            current_sequence[0, -1] = new_row
+
+        # Inverse transform predictions (close column only)
+        return (predictions - self._min[3]) / self._scale[3]
 
     def save(self, filepath: str):
         """Save model and scaler."""
         if self.model:
             self.model.save(filepath)
-        scaler_path = filepath.replace('.h5', '_scaler.pkl')
-        joblib.dump(self.scaler, scaler_path)
+        joblib.dump(self.scaler, _scaler_path(filepath), compress=3)
 
     def load(self, filepath: str):
-        """Load model and scaler."""
-        self.model = keras.models.load_model(filepath)
-        scaler_path = filepath.replace('.h5', '_scaler.pkl')
+        """Load the scaler; the model itself is loaded on first predict()."""
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(filepath)
+        self.model = None
+        self._model_path = filepath
+        scaler_path = _scaler_path(filepath)
         if os.path.exists(scaler_path):
             self.scaler = joblib.load(scaler_path)
+            self._cache_scaling()
         self.is_trained = True
 
 
@@ -207,11 +274,39 @@ class SignalClassifier:
     Uses features from technical indicators, fundamentals, and price trends.
     """
 
+    # Feature layout: (source, key, default, scale), where source indexes
+    # (indicators, fundamentals, price_features). Missing or falsy values
+    # fall back to the default before scaling.
+    _FEATURE_SPEC = (
+        # Technical indicators
+        (0, 'rsi', 50, 0.01),
+        (0, 'macd', 0, 1.0),
+        (0, 'macd_histogram', 0, 1.0),
+        (0, 'sma_20', 0, 1.0),
+        (0, 'sma_50', 0, 1.0),
+        (0, 'sma_200', 0, 1.0),
+        (0, 'bollinger_upper', 0, 1.0),
+        (0, 'bollinger_lower', 0, 1.0),
+        # Fundamental features
+        (1, 'pe_ratio', 20, 0.01),
+        (1, 'earnings_growth', 0, 0.01),
+        (1, 'debt_ratio', 50, 0.01),
+        # Price features
+        (2, 'short_term_trend', 0, 0.01),
+        (2, 'medium_term_trend', 0, 0.01),
+        (2, 'volatility', 20, 0.01),
+        (2, 'volume_ratio', 1, 1.0),
+    )
+
     def __init__(self):
         """Initialize signal classifier."""
         self.model = None
         self.scaler = StandardScaler()
         self.is_trained = False
+        # Saved model path; load() defers reading the weights to first predict()
+        self._model_path = None
+        # Weights as built, restored by reset_weights()
+        self._initial_weights = None
         self.feature_names = []
 
     def build_model(self, input_dim: int, num_classes: int = 3) -> keras.Model:
@@ -237,12 +332,19 @@ class SignalClassifier:
         model.compile(
             optimizer=keras.optimizers.Adam(learning_rate=0.001),
             loss='categorical_crossentropy',
-            metrics=['accuracy']
+            metrics=['accuracy'],
+            jit_compile=settings.ml_xla_enabled,
         )
 
         self.model = model
+        self._initial_weights = model.get_weights()
         return model
 
+    def reset_weights(self) -> None:
+        """Reset the built model to its initial weights for retraining from scratch."""
+        _reset_training_state(self.model, self._initial_weights)
+        self.is_trained = False
+
     def prepare_features(
         self,
         indicators: Dict[str, Any],
@@ -260,36 +362,44 @@ class SignalClassifier:
         Returns:
             Feature vector
         """
-        features = []
+        sources = (indicators, fundamentals, price_features)
+        features = np.empty((1, len(self._FEATURE_SPEC)), dtype=np.float32)
+        for i, (source, key, default, scale) in enumerate(self._FEATURE_SPEC):
+            features[0, i] = (sources[source].get(key) or default) * scale
 
-        # Technical indicators
-        features.extend([
-            indicators.get('rsi', 50) / 100,  # Normalize RSI
-            indicators.get('macd', 0) or 0,
-            indicators.get('macd_histogram', 0) or 0,
-            indicators.get('sma_20', 0) or 0,
-            indicators.get('sma_50', 0) or 0,
-            indicators.get('sma_200', 0) or 0,
-            indicators.get('bollinger_upper', 0) or 0,
-            indicators.get('bollinger_lower', 0) or 0,
-        ])
+        return features
 
-        # Fundamental features
-        features.extend([
-            fundamentals.get('pe_ratio', 20) / 100 if fundamentals.get('pe_ratio') else 0.2,
-            fundamentals.get('earnings_growth', 0) / 100 if fundamentals.get('earnings_growth') else 0,
-            fundamentals.get('debt_ratio', 50) / 100 if fundamentals.get('debt_ratio') else 0.5,
-        ])
+    def prepare_features_batch(
+        self,
+        indicators: pd.DataFrame,
+        fundamentals: pd.DataFrame,
+        price_features: pd.DataFrame
+    ) -> np.ndarray:
+        """
+        Prepare feature vectors for many samples at once.
 
-        # Price features
-        features.extend([
-            price_features.get('short_term_trend', 0) / 100,
-            price_features.get('medium_term_trend', 0) / 100,
-            price_features.get('volatility', 20) / 100,
-            price_features.get('volume_ratio', 1),
-        ])
+        Column-wise equivalent of prepare_features: each frame holds one row
+        per sample, and missing (NaN) or zero values fall back to the defaults.
+
+        Args:
+            indicators: Technical indicators per sample
+            fundamentals: Fundamental metrics per sample
+            price_features: Price-based features per sample
 
-        return np.array(features).reshape(1, -1)
+        Returns:
+            Feature matrix, one row per sample
+        """
+        sources = (indicators, fundamentals, price_features)
+        features = np.empty((len(price_features), len(self._FEATURE_SPEC)), dtype=np.float32)
+        for i, (source, key, default, scale) in enumerate(self._FEATURE_SPEC):
+            frame = sources[source]
+            if key not in frame:
+                features[:, i] = default * scale
+                continue
+            values = frame[key].to_numpy(dtype=np.float64, na_value=np.nan)
+            features[:, i] = np.where(np.isnan(values) | (values == 0), default, values) * scale
+
+        return features
 
     def train(
         self,
@@ -348,14 +458,17 @@ class SignalClassifier:
         Returns:
             Tuple of (signal_type, confidence_score)
         """
+        if self.model is None and self._model_path:
+            self.model = keras.models.load_model(self._model_path)
         if not self.is_trained or self.model is None:
             raise ValueError("Model not trained. Call train() first.")
 
         features = self.prepare_features(indicators, fundamentals, price_features)
         features_scaled = self.scaler.transform(features)
 
-        predictions = self.model.predict(features_scaled, verbose=0)
-        class_idx = np.argmax(predictions[0])
+        # One sample: call the model directly rather than through predict()
+        predictions = np.asarray(self.model(features_scaled, training=False))
+        class_idx = int(np.argmax(predictions[0]))
         confidence = float(predictions[0][class_idx] * 100)
 
         signal_map = {0: 'BUY', 1: 'HOLD', 2: 'SELL'}
@@ -367,13 +480,15 @@ class SignalClassifier:
         """Save model and scaler."""
         if self.model:
             self.model.save(filepath)
-        scaler_path = filepath.replace('.h5', '_scaler.pkl')
-        joblib.dump(self.scaler, scaler_path)
+        joblib.dump(self.scaler, _scaler_path(filepath), compress=3)
 
     def load(self, filepath: str):
-        """Load model and scaler."""
-        self.model = keras.models.load_model(filepath)
-        scaler_path = filepath.replace('.h5', '_scaler.pkl')
+        """Load the scaler; the model itself is loaded on first predict()."""
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(filepath)
+        self.model = None
+        self._model_path = filepath
+        scaler_path = _scaler_path(filepath)
         if os.path.exists(scaler_path):
             self.scaler = joblib.load(scaler_path)
         self.is_trained = True
@@ -3,7 +3,9 @@
 import pandas as pd
 import numpy as np
 import os
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from app.database import SessionLocal
@@ -14,6 +16,112 @@ from app.models.technical_indicator import TechnicalIndicator
 from app.models.fundamental import Fundamental
 from app.ml.models import LSTMForecaster, SignalClassifier
 
+# Most recent prices (up to and including the signal) used for price features
+CLASSIFIER_PRICE_WINDOW = 200
+
+# Signal history rows fetched per round trip while streaming
+SIGNAL_BATCH_SIZE = 10_000
+
+# Classifier label index per signal type (one-hot: BUY=[1,0,0], HOLD=[0,1,0],
+# SELL=[0,0,1]); other types are labelled HOLD
+_LABEL_INDEX = {SignalType.BUY: 0, SignalType.HOLD: 1, SignalType.SELL: 2}
+_HOLD_INDEX = _LABEL_INDEX[SignalType.HOLD]
+
+
+def _latest_per_signal(db: Session, model, columns, signals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fetch the latest point-in-time row dated on or before each signal.
+
+    The table is read once for the signalled stocks, up to the last signal,
+    and each signal is matched to its stock's latest row with an as-of merge.
+
+    Args:
+        db: Database session
+        model: Model with stock_id and date columns (indicators, fundamentals)
+        columns: Columns of the model to return
+        signals: id, stock_id and time of each signal, ordered by time
+
+    Returns:
+        Float frame of the requested columns indexed by SignalHistory ID
+        (signals with no row on or before them are left out)
+    """
+    result = db.execute(
+        select(model.stock_id, model.date, *columns)
+        .where(
+            model.stock_id.in_(signals['stock_id'].unique().tolist()),
+            model.date <= signals['time'].iloc[-1].to_pydatetime(),
+        )
+        .order_by(model.date)
+    )
+    rows = pd.DataFrame(result.all(), columns=list(result.keys()))
+    feature_columns = list(rows.columns[2:])
+    if rows.empty:
+        return pd.DataFrame(columns=feature_columns, index=pd.Index([], name='signal_id'), dtype=np.float64)
+
+    # A date matches as its midnight, so a row dated on the signal's day counts
+    dates = pd.to_datetime(rows['date'])
+    signal_tz = signals['time'].dt.tz
+    rows['date'] = dates.dt.tz_localize(signal_tz) if signal_tz is not None else dates
+    latest = pd.merge_asof(
+        signals[['id', 'stock_id', 'time']],
+        rows,
+        left_on='time',
+        right_on='date',
+        by='stock_id',
+        direction='backward',
+    )
+    latest = latest[latest['date'].notna()]
+    # Nullable feature columns as float64 (None -> NaN) rather than object
+    return latest.set_index('id').rename_axis('signal_id')[feature_columns].astype(np.float64)
+
+
+def _trailing_price_features(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Classifier price features at every price row, over its trailing window.
+
+    Each row sees the stock's last CLASSIFIER_PRICE_WINDOW prices up to and
+    including itself, computed with grouped shifts and rolling windows.
+
+    Args:
+        prices: stock_id, time, close and volume, ordered by (stock_id, time)
+
+    Returns:
+        stock_id, time, history (prices so far) and the price features
+    """
+    window = CLASSIFIER_PRICE_WINDOW
+    by_stock = prices.groupby('stock_id', sort=False)
+    close = prices['close']
+    close_20 = by_stock['close'].shift(19)
+    close_50 = by_stock['close'].shift(49)
+    # A window of N prices holds N - 1 returns
+    returns = close / by_stock['close'].shift(1) - 1
+    volatility = returns.groupby(prices['stock_id'], sort=False).rolling(window - 1, min_periods=2).std().droplevel(0)
+    volume_avg = by_stock['volume'].rolling(window, min_periods=1).mean().droplevel(0)
+
+    return pd.DataFrame({
+        'stock_id': prices['stock_id'],
+        'time': prices['time'],
+        'history': by_stock.cumcount() + 1,
+        'short_term_trend': (close - close_20) / close_20 * 100,
+        'medium_term_trend': ((close - close_50) / close_50 * 100).fillna(0),
+        'volatility': volatility * 100,
+        'volume_ratio': (prices['volume'] / volume_avg).where(volume_avg > 0, 1),
+    })
+
+
+@lru_cache(maxsize=None)
+def _get_forecaster(sequence_length: int) -> LSTMForecaster:
+    """Forecaster built once per sequence length and reused across training runs."""
+    forecaster = LSTMForecaster(sequence_length=sequence_length)
+    forecaster.build_model()
+    return forecaster
+
+
+@lru_cache(maxsize=1)
+def _get_classifier() -> SignalClassifier:
+    """Classifier reused across training runs (its model is built on first train)."""
+    return SignalClassifier()
+
 
 def prepare_training_data_for_lstm(
     stock_id: int,
@@ -41,8 +149,16 @@ def prepare_training_data_for_lstm(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=lookback_days)
 
+        # Plain column tuples (no ORM objects), unpacked into typed columns below
         prices = (
-            db.query(StockPrice)
+            db.query(
+                StockPrice.time,
+                StockPrice.open,
+                StockPrice.high,
+                StockPrice.low,
+                StockPrice.close,
+                StockPrice.volume,
+            )
             .filter(
                 StockPrice.stock_id == stock_id,
                 StockPrice.time >= start_date,
@@ -55,17 +171,15 @@ def prepare_training_data_for_lstm(
         if len(prices) < 100:
             raise ValueError(f"Insufficient data: {len(prices)} records")
 
-        df = pd.DataFrame([
-            {
-                'time': p.time,
-                'open': p.open,
-                'high': p.high,
-                'low': p.low,
-                'close': p.close,
-                'volume': p.volume,
-            }
-            for p in prices
-        ])
+        times, opens, highs, lows, closes, volumes = zip(*prices)
+        df = pd.DataFrame({
+            'time': times,
+            'open': np.asarray(opens, dtype=np.float64),
+            'high': np.asarray(highs, dtype=np.float64),
+            'low': np.asarray(lows, dtype=np.float64),
+            'close': np.asarray(closes, dtype=np.float64),
+            'volume': np.asarray(volumes, dtype=np.float64),
+        })
 
         return df
     finally:
@@ -96,117 +210,89 @@ def prepare_training_data_for_classifier(
         should_close = False
 
     try:
-        # Get all signal history with sufficient data
-        query = db.query(SignalHistory).join(Stock)
-        if stock_ids:
-            query = query.filter(SignalHistory.stock_id.in_(stock_ids))
-
-        signals = query.order_by(SignalHistory.created_at.asc()).all()
-
-        X_features = []
-        y_labels = []
-
-        for signal in signals:
-            # Get indicators at signal time
-            signal_date = signal.created_at.date()
-            indicator = (
-                db.query(TechnicalIndicator)
-                .filter(
-                    TechnicalIndicator.stock_id == signal.stock_id,
-                    TechnicalIndicator.date <= signal_date
-                )
-                .order_by(TechnicalIndicator.date.desc())
-                .first()
-            )
+        # Get all signal history: only the columns used below, streamed in
+        # batches instead of materialized as SignalHistory objects
+        signal_filters = [SignalHistory.stock_id.in_(stock_ids)] if stock_ids else []
+        signal_rows = (
+            db.query(SignalHistory.id, SignalHistory.stock_id, SignalHistory.created_at, SignalHistory.signal_type)
+            .join(Stock)
+            .filter(*signal_filters)
+            .order_by(SignalHistory.created_at.asc())
+            .execution_options(stream_results=True)
+            .yield_per(SIGNAL_BATCH_SIZE)
+        )
+        signals = pd.DataFrame(signal_rows, columns=['id', 'stock_id', 'time', 'signal_type'])
+        if signals.empty:
+            raise ValueError("No training data prepared")
 
-            fundamental = (
-                db.query(Fundamental)
-                .filter(
-                    Fundamental.stock_id == signal.stock_id,
-                    Fundamental.date <= signal_date
-                )
-                .order_by(Fundamental.date.desc())
-                .first()
-            )
+        # Point-in-time indicators and fundamentals for every signal, one
+        # query and one as-of merge per table (instead of two queries per signal)
+        indicators = _latest_per_signal(
+            db,
+            TechnicalIndicator,
+            (
+                TechnicalIndicator.rsi,
+                TechnicalIndicator.macd,
+                TechnicalIndicator.macd_histogram,
+                TechnicalIndicator.sma_20,
+                TechnicalIndicator.sma_50,
+                TechnicalIndicator.sma_200,
+                TechnicalIndicator.bollinger_upper,
+                TechnicalIndicator.bollinger_lower,
+            ),
+            signals,
+        )
+        fundamentals = _latest_per_signal(
+            db,
+            Fundamental,
+            (Fundamental.pe_ratio, Fundamental.earnings_growth, Fundamental.debt_ratio),
+            signals,
+        )
 
-            # Get price data for trend calculation
-            prices = (
-                db.query(StockPrice)
-                .filter(
-                    StockPrice.stock_id == signal.stock_id,
-                    StockPrice.time <= signal.created_at
-                )
-                .order_by(StockPrice.time.desc())
-                .limit(200)
-                .all()
+        # Price features for every signal: computed per stock over all prices in
+        # one pass, then matched to each signal's latest price at or before it
+        prices = pd.DataFrame(
+            db.query(StockPrice.stock_id, StockPrice.time, StockPrice.close, StockPrice.volume)
+            .filter(
+                StockPrice.stock_id.in_(signals['stock_id'].unique().tolist()),
+                StockPrice.time <= signals['time'].iloc[-1].to_pydatetime()
             )
+            .order_by(StockPrice.stock_id, StockPrice.time)
+            .all(),
+            columns=['stock_id', 'time', 'close', 'volume'],
+        )
+        if prices.empty:
+            raise ValueError("No training data prepared")
 
-            if not indicator or len(prices) < 20:
-                continue
-
-            # Prepare features
-            indicators_dict = {
-                'rsi': indicator.rsi,
-                'macd': indicator.macd,
-                'macd_histogram': indicator.macd_histogram,
-                'sma_20': indicator.sma_20,
-                'sma_50': indicator.sma_50,
-                'sma_200': indicator.sma_200,
-                'bollinger_upper': indicator.bollinger_upper,
-                'bollinger_lower': indicator.bollinger_lower,
-            }
-
-            fundamentals_dict = {}
-            if fundamental:
-                fundamentals_dict = {
-                    'pe_ratio': fundamental.pe_ratio,
-                    'earnings_growth': fundamental.earnings_growth,
-                    'debt_ratio': fundamental.debt_ratio,
-                }
-
-            # Calculate price features
-            prices_df = pd.DataFrame([
-                {'close': p.close, 'volume': p.volume}
-                for p in reversed(prices)
-            ])
-
-            if len(prices_df) < 20:
-                continue
-
-            # Calculate trends
-            short_term = 0
-            medium_term = 0
-            if len(prices_df) >= 20:
-                short_term = ((prices_df['close'].iloc[-1] - prices_df['close'].iloc[-20]) / prices_df['close'].iloc[-20]) * 100
-            if len(prices_df) >= 50:
-                medium_term = ((prices_df['close'].iloc[-1] - prices_df['close'].iloc[-50]) / prices_df['close'].iloc[-50]) * 100
-
-            volatility = prices_df['close'].pct_change().std() * 100 if len(prices_df) > 1 else 20
-            volume_avg = prices_df['volume'].mean()
-            current_volume = prices_df['volume'].iloc[-1]
-            volume_ratio = current_volume / volume_avg if volume_avg > 0 else 1
-
-            price_features = {
-                'short_term_trend': short_term,
-                'medium_term_trend': medium_term,
-                'volatility': volatility,
-                'volume_ratio': volume_ratio,
-            }
-
-            # Create feature vector
-            classifier = SignalClassifier()
-            features = classifier.prepare_features(indicators_dict, fundamentals_dict, price_features)
-            X_features.append(features[0])
-
-            # Create label (one-hot: BUY=[1,0,0], HOLD=[0,1,0], SELL=[0,0,1])
-            signal_map = {'BUY': [1, 0, 0], 'HOLD': [0, 1, 0], 'SELL': [0, 0, 1]}
-            label = signal_map.get(signal.signal_type.value, [0, 1, 0])
-            y_labels.append(label)
-
-        if len(X_features) == 0:
+        signal_prices = pd.merge_asof(
+            signals[['stock_id', 'time']],
+            _trailing_price_features(prices).sort_values('time', kind='stable'),
+            on='time',
+            by='stock_id',
+            direction='backward',
+        )
+
+        # Keep signals with an indicator and at least 20 prices up to them
+        # (history is NaN when there are none at all)
+        signal_ids = pd.Index(signals['id'])
+        usable = signal_ids.isin(indicators.index) & (signal_prices['history'].to_numpy() >= 20)
+        if not usable.any():
             raise ValueError("No training data prepared")
+        signal_ids = signal_ids[usable]
 
-        return np.array(X_features), np.array(y_labels)
+        # Feature matrix in one pass (missing fundamentals fall back to defaults)
+        classifier = SignalClassifier()
+        X_features = classifier.prepare_features_batch(
+            indicators.reindex(signal_ids),
+            fundamentals.reindex(signal_ids),
+            signal_prices[usable],
+        )
+
+        # Create labels: class indices, then one-hot rows of the identity matrix
+        label_index = signals['signal_type'][usable].map(_LABEL_INDEX).fillna(_HOLD_INDEX).to_numpy(dtype=np.intp)
+        y_labels = np.eye(len(_LABEL_INDEX), dtype=np.float32)[label_index]
+
+        return X_features, y_labels
     finally:
         if should_close:
             db.close()
@@ -239,14 +325,14 @@ def train_lstm_model(
         # Prepare data
         prices_df = prepare_training_data_for_lstm(stock_id, lookback_days=365, db=db)
 
-        # Train model
-        forecaster = LSTMForecaster(sequence_length=sequence_length)
-        forecaster.build_model()
+        # Train model (reusing the compiled model from earlier runs, reset)
+        forecaster = _get_forecaster(sequence_length)
+        forecaster.reset_weights()
         history = forecaster.train(prices_df, epochs=epochs, verbose=0)
 
         # Save model
         if model_save_path is None:
-            model_save_path = f"models/lstm_{stock.symbol}_{datetime.now().strftime('%Y%m%d')}.h5"
+            model_save_path = f"models/lstm_{stock.symbol}_{datetime.now().strftime('%Y%m%d')}.keras"
         os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
         forecaster.save(model_save_path)
 
@@ -283,13 +369,15 @@ def train_classifier_model(
         # Prepare data
         X, y = prepare_training_data_for_classifier(stock_ids=stock_ids, db=db)
 
-        # Train model
-        classifier = SignalClassifier()
+        # Train model (reusing the compiled model from earlier runs, reset)
+        classifier = _get_classifier()
+        if classifier.model is not None:
+            classifier.reset_weights()
         history = classifier.train(X, y, epochs=epochs, verbose=0)
 
         # Save model
         if model_save_path is None:
-            model_save_path = f"models/classifier_{datetime.now().strftime('%Y%m%d')}.h5"
+            model_save_path = f"models/classifier_{datetime.now().strftime('%Y%m%d')}.keras"
         os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
         classifier.save(model_save_path)
 
@@ -29,6 +29,7 @@ class Fundamental(Base):
 
     # Unique constraint on stock_id and date
     __table_args__ = (
+        # Also serves latest-first reads per stock (backward scan, no sort)
         Index("idx_fundamentals_stock_date", "stock_id", "date", unique=True),
     )
 
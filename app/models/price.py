@@ -23,6 +23,8 @@ class StockPrice(Base):
 
     # Indexes for efficient queries
     __table_args__ = (
+        # Latest-N bars per stock: "stock_id = ? ORDER BY time DESC LIMIT n" is a
+        # backward range scan of this index, so no separate DESC index is needed
         Index("idx_stock_prices_stock_time", "stock_id", "time"),
     )
 
@@ -51,6 +51,13 @@ class Signal(Base):
 
     __table_args__ = (
         Index("idx_signals_stock_created", "stock_id", "created_at"),
+        # Top-N signals per type (market highlights) without a sort
+        Index(
+            "idx_signals_type_confidence",
+            signal_type,
+            confidence_score.desc(),
+            postgresql_include=["stock_id"],
+        ),
     )
 
     def __repr__(self):
@@ -1,6 +1,6 @@
 """Stock model."""
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -55,5 +55,21 @@ class Stock(Base):
         "TechnicalIndicator", back_populates="stock", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Active stocks per market, covering the id used for joins
+        Index("idx_stocks_market_active", "market", "is_active", postgresql_include=["id"]),
+    )
+
     def __repr__(self):
         return f"<Stock(symbol={self.symbol}, market={self.market.value})>"
+
+
+# Registered with the model, not the lookup service, so every process that
+# writes stocks (Celery workers included) evicts the cached lookups
+@event.listens_for(Stock, "after_update")
+@event.listens_for(Stock, "after_delete")
+def _invalidate_stock_lookups(mapper, connection, target) -> None:
+    # Imported lazily: the lookup service imports this module
+    from app.services.stock_lookup import invalidate_stock
+
+    invalidate_stock(target)
@@ -32,6 +32,7 @@ class TechnicalIndicator(Base):
 
     # Unique constraint on stock_id and date
     __table_args__ = (
+        # Also serves latest-first reads per stock (backward scan, no sort)
         Index("idx_technical_indicators_stock_date", "stock_id", "date", unique=True),
     )
 
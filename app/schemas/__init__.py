@@ -1,29 +1,37 @@
 """Pydantic schemas for API requests and responses."""
 
-from app.schemas.stock import StockCreate, StockResponse, StockListResponse
-from app.schemas.price import PriceResponse, PriceListResponse
+from app.schemas.stock import StockCreate, StockResponse, StockListResponse, STOCK_LIST_ADAPTER
+from app.schemas.price import PriceResponse, PriceListResponse, PRICE_LIST_ADAPTER
 from app.schemas.signal import (
     SignalResponse,
     SignalCreate,
     SignalExplanation,
     SignalListResponse,
+    SIGNAL_LIST_ADAPTER,
 )
 from app.schemas.fundamental import FundamentalResponse
-from app.schemas.technical_indicator import TechnicalIndicatorResponse
+from app.schemas.technical_indicator import (
+    TechnicalIndicatorResponse,
+    TECHNICAL_INDICATOR_LIST_ADAPTER,
+)
 from app.schemas.common import ErrorResponse, SuccessResponse, Meta
 
 __all__ = [
     "StockCreate",
     "StockResponse",
     "StockListResponse",
+    "STOCK_LIST_ADAPTER",
     "PriceResponse",
     "PriceListResponse",
+    "PRICE_LIST_ADAPTER",
     "SignalResponse",
     "SignalCreate",
     "SignalExplanation",
     "SignalListResponse",
+    "SIGNAL_LIST_ADAPTER",
     "FundamentalResponse",
     "TechnicalIndicatorResponse",
+    "TECHNICAL_INDICATOR_LIST_ADAPTER",
     "ErrorResponse",
     "SuccessResponse",
     "Meta",
@@ -1,10 +1,24 @@
 """Common schemas for API responses."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, GetCoreSchemaHandler
+from pydantic_core import core_schema
 from typing import Optional, Any, Dict
 from datetime import datetime
 
 
+class Symbol(str):
+    """
+    Stock symbol request parameter, normalized to uppercase (as stored).
+
+    A type rather than ``Annotated[str, AfterValidator(...)]`` because FastAPI
+    drops non-FastAPI ``Annotated`` metadata from path and body parameters.
+    """
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(str.upper, core_schema.str_schema())
+
+
 class Meta(BaseModel):
     """Metadata for API responses."""
 
@@ -13,6 +27,7 @@ class Meta(BaseModel):
     page: Optional[int] = None
     page_size: Optional[int] = None
     total: Optional[int] = None
+    message: Optional[str] = None
 
 
 class SuccessResponse(BaseModel):
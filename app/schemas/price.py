@@ -1,6 +1,6 @@
 """Price schemas."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import List
 from datetime import datetime
 
@@ -20,6 +20,10 @@ class PriceResponse(BaseModel):
         from_attributes = True
 
 
+# Validates a whole list of prices in one call (no per-item dispatch)
+PRICE_LIST_ADAPTER = TypeAdapter(List[PriceResponse])
+
+
 class PriceListResponse(BaseModel):
     """Schema for price list response."""
 
@@ -1,6 +1,6 @@
 """Signal schemas."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from app.models.signal import SignalType, RiskLevel, HoldingPeriod
@@ -43,6 +43,10 @@ class SignalResponse(BaseModel):
         from_attributes = True
 
 
+# Validates/dumps a whole list of signals in one call (no per-item dispatch)
+SIGNAL_LIST_ADAPTER = TypeAdapter(List[SignalResponse])
+
+
 class SignalListResponse(BaseModel):
     """Schema for signal list response."""
 
@@ -1,6 +1,6 @@
 """Stock schemas."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import Optional, List
 from datetime import datetime
 from app.models.stock import Market, StockType, AssetType
@@ -36,6 +36,10 @@ class StockResponse(BaseModel):
         from_attributes = True
 
 
+# Validates a whole list of stocks in one call (no per-item dispatch)
+STOCK_LIST_ADAPTER = TypeAdapter(List[StockResponse])
+
+
 class StockListResponse(BaseModel):
     """Schema for paginated stock list response."""
 
@@ -43,3 +47,4 @@ class StockListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[int] = None  # Pass as ?cursor= to fetch the next page
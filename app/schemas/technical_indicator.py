@@ -1,7 +1,7 @@
 """Technical indicator schemas."""
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, TypeAdapter
+from typing import List, Optional
 from datetime import date
 
 
@@ -27,3 +27,7 @@ class TechnicalIndicatorResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Validates a whole list of indicators in one call (no per-item dispatch)
+TECHNICAL_INDICATOR_LIST_ADAPTER = TypeAdapter(List[TechnicalIndicatorResponse])
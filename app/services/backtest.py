@@ -1,11 +1,144 @@
 """Backtesting service for signal performance analysis."""
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, date, timedelta
-import pandas as pd
+import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.signal import SignalHistory, SignalType
 from app.models.price import StockPrice
+from app.utils._njit import njit
+
+# Signal types as kernel codes (position sign when followed)
+_SIGNAL_CODES = {SignalType.BUY: 1, SignalType.SELL: -1, SignalType.HOLD: 0}
+
+
+@njit(cache=True)
+def _simulate_trades(
+    price_days: np.ndarray,
+    closes: np.ndarray,
+    signal_days: np.ndarray,
+    signal_codes: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Follow BUY/SELL signals, flipping between long and short positions.
+
+    Each signal executes at the close of the bar nearest its calendar day,
+    and any position still open is closed at the final close.
+
+    Args:
+        price_days: Day ordinal of each price bar (ascending)
+        closes: Close price of each bar
+        signal_days: Day ordinal of each signal (ascending)
+        signal_codes: 1 for BUY, -1 for SELL, 0 for HOLD
+
+    Returns:
+        Per-trade arrays: side (1 long / -1 short), entry signal index,
+        exit signal index (-1 for the final close), entry price, exit price
+        and P&L percent
+    """
+    n = signal_days.shape[0]
+    sides = np.empty(n + 1, dtype=np.int8)
+    entry_signals = np.empty(n + 1, dtype=np.int64)
+    exit_signals = np.empty(n + 1, dtype=np.int64)
+    entry_prices = np.empty(n + 1, dtype=np.float64)
+    exit_prices = np.empty(n + 1, dtype=np.float64)
+    pnls = np.empty(n + 1, dtype=np.float64)
+
+    n_trades = 0
+    position = 0
+    entry_price = 0.0
+    entry_signal = -1
+
+    for i in range(n):
+        code = signal_codes[i]
+        if code == 0 or code == position:
+            continue
+
+        # Price on (or closest to) the signal date
+        nearest = np.argmin(np.abs(price_days - signal_days[i]))
+        current_price = closes[nearest]
+
+        if position != 0 and entry_price != 0.0:
+            # Close the opposite position
+            sides[n_trades] = position
+            entry_signals[n_trades] = entry_signal
+            exit_signals[n_trades] = i
+            entry_prices[n_trades] = entry_price
+            exit_prices[n_trades] = current_price
+            pnls[n_trades] = position * (current_price - entry_price) / entry_price * 100.0
+            n_trades += 1
+
+        position = code
+        entry_price = current_price
+        entry_signal = i
+
+    # Close final position if still open
+    if position != 0 and entry_price != 0.0:
+        final_price = closes[closes.shape[0] - 1]
+        sides[n_trades] = position
+        entry_signals[n_trades] = entry_signal
+        exit_signals[n_trades] = -1
+        entry_prices[n_trades] = entry_price
+        exit_prices[n_trades] = final_price
+        pnls[n_trades] = position * (final_price - entry_price) / entry_price * 100.0
+        n_trades += 1
+
+    return (
+        sides[:n_trades],
+        entry_signals[:n_trades],
+        exit_signals[:n_trades],
+        entry_prices[:n_trades],
+        exit_prices[:n_trades],
+        pnls[:n_trades],
+    )
+
+
+@njit(cache=True)
+def _equity_curve_loop(pnls: np.ndarray) -> Tuple[np.ndarray, float, float, float, float, float]:
+    """
+    Build the cumulative equity curve and summary statistics for trade P&Ls.
+
+    Args:
+        pnls: Per-trade P&L percentages (non-empty)
+
+    Returns:
+        Tuple of (equity, total_return, win_rate, max_drawdown, volatility, sharpe)
+    """
+    n = pnls.shape[0]
+    equity = np.empty(n, dtype=np.float64)
+
+    cumulative = 0.0
+    running_max = pnls[0]  # Peak of the curve so far, seeded with its first point
+    max_drawdown = 0.0
+    wins = 0
+    for i in range(n):
+        cumulative += pnls[i]
+        equity[i] = cumulative
+        if cumulative > running_max:
+            running_max = cumulative
+        drawdown = (cumulative - running_max) / (running_max + 100.0)
+        if i == 0 or drawdown < max_drawdown:
+            max_drawdown = drawdown
+        if pnls[i] > 0:
+            wins += 1
+
+    total_return = cumulative
+    win_rate = wins / n * 100.0
+
+    # Volatility: sample std dev of trade returns
+    volatility = 0.0
+    if n > 1:
+        mean = total_return / n
+        sq = 0.0
+        for i in range(n):
+            sq += (pnls[i] - mean) ** 2
+        volatility = np.sqrt(sq / (n - 1))
+
+    # Sharpe ratio (simplified, assuming risk-free rate = 0)
+    sharpe = (total_return / n) / volatility if volatility > 0 else 0.0
+
+    return equity, total_return, win_rate, max_drawdown * 100.0, volatility, sharpe
 
 
 class BacktestService:
@@ -30,17 +163,23 @@ class BacktestService:
         Returns:
             Dictionary with performance metrics
         """
+        range_start = datetime.combine(start_date, datetime.min.time())
+        range_end = datetime.combine(end_date, datetime.max.time())
+
         # Get signal history
-        signals = (
-            db.query(SignalHistory)
-            .filter(
+        signals = db.execute(
+            select(
+                SignalHistory.created_at,
+                SignalHistory.signal_type,
+                SignalHistory.confidence_score,
+            )
+            .where(
                 SignalHistory.stock_id == stock_id,
-                SignalHistory.created_at >= datetime.combine(start_date, datetime.min.time()),
-                SignalHistory.created_at <= datetime.combine(end_date, datetime.max.time()),
+                SignalHistory.created_at >= range_start,
+                SignalHistory.created_at <= range_end,
             )
             .order_by(SignalHistory.created_at.asc())
-            .all()
-        )
+        ).all()
 
         if not signals:
             return {
@@ -49,16 +188,15 @@ class BacktestService:
             }
 
         # Get price data for the period
-        prices = (
-            db.query(StockPrice)
-            .filter(
+        prices = db.execute(
+            select(StockPrice.time, StockPrice.close)
+            .where(
                 StockPrice.stock_id == stock_id,
-                StockPrice.time >= datetime.combine(start_date, datetime.min.time()),
-                StockPrice.time <= datetime.combine(end_date, datetime.max.time()),
+                StockPrice.time >= range_start,
+                StockPrice.time <= range_end,
             )
             .order_by(StockPrice.time.asc())
-            .all()
-        )
+        ).all()
 
         if len(prices) < 2:
             return {
@@ -66,158 +204,73 @@ class BacktestService:
                 "error": "Insufficient price data for backtest",
             }
 
-        # Convert to DataFrame
-        prices_df = pd.DataFrame(
-            [
-                {
-                    "time": p.time,
-                    "close": p.close,
-                }
-                for p in prices
-            ]
+        # Pack rows into flat arrays for the compiled kernels
+        price_days = np.fromiter((p.time.toordinal() for p in prices), dtype=np.int64, count=len(prices))
+        closes = np.fromiter((p.close for p in prices), dtype=np.float64, count=len(prices))
+        signal_days = np.fromiter(
+            (s.created_at.toordinal() for s in signals), dtype=np.int64, count=len(signals)
+        )
+        signal_codes = np.fromiter(
+            (_SIGNAL_CODES.get(s.signal_type, 0) for s in signals), dtype=np.int8, count=len(signals)
         )
-        prices_df.set_index("time", inplace=True)
 
         # Simulate following signals
-        trades = []
-        current_position = None  # None, "BUY", or "SELL"
-        entry_price = None
-        entry_date = None
-
-        for signal in signals:
-            signal_date = signal.created_at.date()
-            signal_type = signal.signal_type
-
-            # Get price on signal date
-            price_on_date = prices_df[prices_df.index.date == signal_date]
-            if price_on_date.empty:
-                # Find closest price
-                price_on_date = prices_df.iloc[
-                    (prices_df.index.date - signal_date).abs().argsort()[:1]
-                ]
-            if price_on_date.empty:
-                continue
-
-            current_price = float(price_on_date["close"].iloc[0])
-
-            # Execute signal logic
-            if signal_type == SignalType.BUY and current_position != "BUY":
-                if current_position == "SELL":
-                    # Close short position
-                    if entry_price:
-                        pnl = ((entry_price - current_price) / entry_price) * 100
-                        trades.append(
-                            {
-                                "type": "SELL_CLOSE",
-                                "entry_date": entry_date,
-                                "exit_date": signal_date,
-                                "entry_price": entry_price,
-                                "exit_price": current_price,
-                                "pnl_percent": pnl,
-                                "signal_confidence": signal.confidence_score,
-                            }
-                        )
-                # Open long position
-                current_position = "BUY"
-                entry_price = current_price
-                entry_date = signal_date
-
-            elif signal_type == SignalType.SELL and current_position != "SELL":
-                if current_position == "BUY":
-                    # Close long position
-                    if entry_price:
-                        pnl = ((current_price - entry_price) / entry_price) * 100
-                        trades.append(
-                            {
-                                "type": "BUY_CLOSE",
-                                "entry_date": entry_date,
-                                "exit_date": signal_date,
-                                "entry_price": entry_price,
-                                "exit_price": current_price,
-                                "pnl_percent": pnl,
-                                "signal_confidence": signal.confidence_score,
-                            }
-                        )
-                # Open short position
-                current_position = "SELL"
-                entry_price = current_price
-                entry_date = signal_date
-
-            elif signal_type == SignalType.HOLD:
-                # Hold current position, no action
-                pass
-
-        # Close final position if still open
-        if current_position and entry_price:
-            final_price = float(prices_df["close"].iloc[-1])
-            final_date = prices_df.index[-1].date()
-            if current_position == "BUY":
-                pnl = ((final_price - entry_price) / entry_price) * 100
-            else:
-                pnl = ((entry_price - final_price) / entry_price) * 100
-
-            trades.append(
-                {
-                    "type": f"{current_position}_CLOSE",
-                    "entry_date": entry_date,
-                    "exit_date": final_date,
-                    "entry_price": entry_price,
-                    "exit_price": final_price,
-                    "pnl_percent": pnl,
-                    "signal_confidence": None,
-                }
-            )
+        sides, entry_signals, exit_signals, entry_prices, exit_prices, pnls = _simulate_trades(
+            price_days, closes, signal_days, signal_codes
+        )
 
         # Calculate metrics
-        if not trades:
+        if len(pnls) == 0:
             return {
                 "total_signals": len(signals),
                 "total_trades": 0,
                 "error": "No trades executed",
             }
 
-        pnls = [t["pnl_percent"] for t in trades]
-        winning_trades = [p for p in pnls if p > 0]
-        losing_trades = [p for p in pnls if p < 0]
-
-        total_return = sum(pnls)
-        win_rate = (len(winning_trades) / len(trades)) * 100 if trades else 0
-        avg_win = sum(winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = sum(losing_trades) / len(losing_trades) if losing_trades else 0
-
-        # Calculate drawdown
-        cumulative_returns = []
-        cumulative = 0
-        for pnl in pnls:
-            cumulative += pnl
-            cumulative_returns.append(cumulative)
-
-        if cumulative_returns:
-            running_max = pd.Series(cumulative_returns).expanding().max()
-            drawdown = (pd.Series(cumulative_returns) - running_max) / (running_max + 100)
-            max_drawdown = drawdown.min() * 100
-        else:
-            max_drawdown = 0
+        final_date = prices[-1].time.date()
+        trades = []
+        for i in range(len(pnls)):
+            exit_signal = exit_signals[i]
+            side = "BUY" if sides[i] == 1 else "SELL"
+            trades.append(
+                {
+                    "type": f"{side}_CLOSE",
+                    "entry_date": signals[entry_signals[i]].created_at.date(),
+                    "exit_date": signals[exit_signal].created_at.date() if exit_signal >= 0 else final_date,
+                    "entry_price": float(entry_prices[i]),
+                    "exit_price": float(exit_prices[i]),
+                    "pnl_percent": float(pnls[i]),
+                    "signal_confidence": signals[exit_signal].confidence_score if exit_signal >= 0 else None,
+                }
+            )
 
-        # Calculate volatility (std dev of returns)
-        volatility = pd.Series(pnls).std() if len(pnls) > 1 else 0
+        (
+            _equity,
+            total_return,
+            win_rate,
+            max_drawdown,
+            volatility,
+            sharpe_ratio,
+        ) = _equity_curve_loop(pnls)
 
-        # Sharpe ratio (simplified, assuming risk-free rate = 0)
-        sharpe_ratio = (total_return / len(trades)) / volatility if volatility > 0 else 0
+        winning_trades = pnls[pnls > 0]
+        losing_trades = pnls[pnls < 0]
+        avg_win = winning_trades.mean() if len(winning_trades) else 0
+        avg_loss = losing_trades.mean() if len(losing_trades) else 0
 
         return {
             "total_signals": len(signals),
             "total_trades": len(trades),
             "winning_trades": len(winning_trades),
             "losing_trades": len(losing_trades),
-            "win_rate": round(win_rate, 2),
-            "total_return_percent": round(total_return, 2),
-            "average_return_per_trade": round(total_return / len(trades), 2),
-            "average_win": round(avg_win, 2),
-            "average_loss": round(avg_loss, 2),
-            "max_drawdown_percent": round(max_drawdown, 2),
-            "volatility": round(volatility, 2),
-            "sharpe_ratio": round(sharpe_ratio, 2),
+            "win_rate": round(float(win_rate), 2),
+            "total_return_percent": round(float(total_return), 2),
+            "average_return_per_trade": round(float(total_return) / len(trades), 2),
+            "average_win": round(float(avg_win), 2),
+            "average_loss": round(float(avg_loss), 2),
+            "max_drawdown_percent": round(float(max_drawdown), 2),
+            "volatility": round(float(volatility), 2),
+            "sharpe_ratio": round(float(sharpe_ratio), 2),
             "trades": trades[-10:],  # Last 10 trades
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -1,11 +1,37 @@
 """Redis caching service."""
 
+import asyncio
+import hashlib
 import json
+import threading
+import uuid
+import weakref
 import redis
-from typing import Optional, Any
+from cachetools import TTLCache
+from typing import Optional, Any, Awaitable, Callable, Dict, Tuple
 from datetime import timedelta
 from app.config import settings
 
+# Cross-worker recompute lease and how often waiters re-check the cache
+LEASE_TTL_MS = 5000
+LEASE_POLL_INTERVAL = 0.05
+
+# Per-process (L1) cache in front of Redis for small, hot payloads
+L1_MAXSIZE = 128
+L1_TTL = 60
+
+# Short-lived per-process tier for decoded JSON values of hot keys (get(local=True))
+L1_JSON_MAXSIZE = 1024
+L1_JSON_TTL = 5
+
+# Pub/sub channel used to drop stale L1 entries in other workers
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+def payload_etag(payload: bytes) -> str:
+    """Entity tag for a cached payload (blake2b digest of its bytes)."""
+    return f'W/"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
 
 class CacheService:
     """Service for Redis caching operations."""
@@ -13,21 +39,43 @@ class CacheService:
     def __init__(self):
         """Initialize Redis connection."""
         self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        # Undecoded client for pre-serialized payloads (JSON bytes served as-is)
+        self.raw_client = redis.from_url(settings.redis_url)
+        # In-process single-flight locks, dropped once no coroutine holds them
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # L1 cache, shared with the invalidation listener thread
+        self._l1: TTLCache = TTLCache(maxsize=L1_MAXSIZE, ttl=L1_TTL)
+        self._l1_json: TTLCache = TTLCache(maxsize=L1_JSON_MAXSIZE, ttl=L1_JSON_TTL)
+        self._l1_lock = threading.RLock()
+        self._instance_id = uuid.uuid4().hex
+        self._invalidation_listener = None
 
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: str, local: bool = False) -> Optional[Any]:
         """
         Get value from cache.
 
         Args:
             key: Cache key
+            local: Check (and fill) the short-lived in-process tier before
+                Redis; the returned value is shared, so callers must not mutate it
 
         Returns:
             Cached value or None
         """
+        if local:
+            with self._l1_lock:
+                cached = self._l1_json.get(key)
+            if cached is not None:
+                return cached
         try:
             value = self.redis_client.get(key)
             if value:
-                return json.loads(value)
+                decoded = json.loads(value)
+                if local:
+                    self._listen_for_invalidations()
+                    with self._l1_lock:
+                        self._l1_json[key] = decoded
+                return decoded
             return None
         except Exception:
             return None
@@ -44,12 +92,251 @@ class CacheService:
         Returns:
             True if successful, False otherwise
         """
+        self.l1_evict(key)
         try:
             serialized = json.dumps(value, default=str)
-            return self.redis_client.setex(key, ttl, serialized)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(key, ttl, serialized)
+            pipe.publish(INVALIDATION_CHANNEL, f"{self._instance_id} {key}")
+            return bool(pipe.execute()[0])
+        except Exception:
+            return False
+
+    def get_raw(self, key: str, local: bool = False) -> Optional[bytes]:
+        """
+        Get raw bytes from cache without JSON decoding.
+
+        Args:
+            key: Cache key
+            local: Check (and fill) the in-process L1 cache before Redis
+
+        Returns:
+            Cached bytes or None
+        """
+        if local:
+            cached = self.l1_get(key)
+            if cached is not None:
+                return cached
+        try:
+            cached = self.raw_client.get(key)
+        except Exception:
+            return None
+        if cached is not None and local:
+            self.l1_set(key, cached)
+        return cached
+
+    def set_raw(self, key: str, value: bytes, ttl: int) -> bool:
+        """
+        Set pre-serialized bytes in cache with TTL.
+
+        The payload's ETag is stored alongside under ``{key}:etag`` so
+        conditional requests can be answered without fetching the payload.
+
+        Args:
+            key: Cache key
+            value: Bytes to cache (stored as-is)
+            ttl: Time to live in seconds
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            pipe = self.raw_client.pipeline(transaction=False)
+            pipe.setex(key, ttl, value)
+            pipe.setex(f"{key}:etag", ttl, payload_etag(value))
+            pipe.publish(INVALIDATION_CHANNEL, f"{self._instance_id} {key}")
+            return all(pipe.execute()[:2])
         except Exception:
             return False
 
+    def get_etag(self, key: str) -> Optional[str]:
+        """
+        Get the ETag of a cached raw payload.
+
+        Args:
+            key: Cache key of the payload
+
+        Returns:
+            ETag or None
+        """
+        local = self.l1_get(key)
+        if local is not None:
+            return payload_etag(local)
+        try:
+            return self.redis_client.get(f"{key}:etag")
+        except Exception:
+            return None
+
+    def l1_get(self, key: str) -> Optional[bytes]:
+        """
+        Get a raw payload from the in-process cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached bytes or None
+        """
+        with self._l1_lock:
+            return self._l1.get(key)
+
+    def l1_set(self, key: str, value: bytes) -> None:
+        """
+        Store a raw payload in the in-process cache.
+
+        Args:
+            key: Cache key
+            value: Bytes to cache
+        """
+        self._listen_for_invalidations()
+        with self._l1_lock:
+            self._l1[key] = value
+
+    def l1_evict(self, key: str) -> None:
+        """
+        Drop a key from the in-process caches.
+
+        Args:
+            key: Cache key
+        """
+        with self._l1_lock:
+            self._l1.pop(key, None)
+            self._l1_json.pop(key, None)
+
+    def _listen_for_invalidations(self) -> None:
+        """Start the pub/sub listener that evicts keys rewritten by other workers."""
+        with self._l1_lock:
+            if self._invalidation_listener is not None:
+                return
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation})
+                self._invalidation_listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            except Exception:
+                # L1 entries still expire after L1_TTL; retry on the next l1_set
+                pass
+
+    def _on_invalidation(self, message: dict) -> None:
+        """Evict a key invalidated by another worker."""
+        origin, _, key = message["data"].partition(" ")
+        if origin != self._instance_id:
+            self.l1_evict(key)
+
+    # Async variants for code on the event loop: the Redis round trip runs in
+    # a worker thread, so a slow or unreachable Redis (socket timeouts) stalls
+    # only that call rather than every request in the process. In-process
+    # (L1) hits are answered inline.
+
+    async def get_async(self, key: str, local: bool = False) -> Optional[Any]:
+        """Async variant of get()."""
+        if local:
+            with self._l1_lock:
+                cached = self._l1_json.get(key)
+            if cached is not None:
+                return cached
+        return await asyncio.to_thread(self.get, key, local)
+
+    async def set_async(self, key: str, value: Any, ttl: int) -> bool:
+        """Async variant of set()."""
+        return await asyncio.to_thread(self.set, key, value, ttl)
+
+    async def get_raw_async(self, key: str, local: bool = False) -> Optional[bytes]:
+        """Async variant of get_raw()."""
+        if local:
+            cached = self.l1_get(key)
+            if cached is not None:
+                return cached
+        return await asyncio.to_thread(self.get_raw, key, local)
+
+    async def set_raw_async(self, key: str, value: bytes, ttl: int) -> bool:
+        """Async variant of set_raw()."""
+        return await asyncio.to_thread(self.set_raw, key, value, ttl)
+
+    async def get_etag_async(self, key: str) -> Optional[str]:
+        """Async variant of get_etag()."""
+        local = self.l1_get(key)
+        if local is not None:
+            return payload_etag(local)
+        return await asyncio.to_thread(self.get_etag, key)
+
+    async def get_hash_async(self, key: str) -> Dict[str, str]:
+        """Async variant of get_hash()."""
+        return await asyncio.to_thread(self.get_hash, key)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        ttl: int,
+        loader: Callable[[], Awaitable[bytes]],
+        local: bool = False,
+    ) -> Tuple[bytes, bool]:
+        """
+        Read-through cache for raw payloads with single-flight recomputation.
+
+        On a miss only one coroutine per process (and, via a Redis lease,
+        one worker across processes) runs the loader; concurrent callers
+        wait and then read the freshly cached value.
+
+        Args:
+            key: Cache key
+            ttl: Time to live in seconds
+            loader: Coroutine function producing the bytes to cache
+            local: Also keep the payload in the in-process L1 cache
+
+        Returns:
+            Tuple of (payload, cache_hit)
+        """
+        cached = await self.get_raw_async(key, local)
+        if cached is not None:
+            return cached, True
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+
+        async with lock:
+            cached = await self.get_raw_async(key, local)
+            if cached is not None:
+                return cached, True
+
+            lease_key = f"{key}:lock"
+            token = uuid.uuid4().hex
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + LEASE_TTL_MS / 1000
+            while not await asyncio.to_thread(self._acquire_lease, lease_key, token):
+                await asyncio.sleep(LEASE_POLL_INTERVAL)
+                cached = await self.get_raw_async(key, local)
+                if cached is not None:
+                    return cached, True
+                if loop.time() >= deadline:
+                    # Lease holder stalled or died; compute ourselves
+                    break
+
+            try:
+                payload = await loader()
+                await self.set_raw_async(key, payload, ttl)
+                if local:
+                    self.l1_set(key, payload)
+                return payload, False
+            finally:
+                await asyncio.to_thread(self._release_lease, lease_key, token)
+
+    def _acquire_lease(self, lease_key: str, token: str) -> bool:
+        """Try to take the cross-worker recompute lease (True if Redis is unavailable)."""
+        try:
+            return bool(self.redis_client.set(lease_key, token, nx=True, px=LEASE_TTL_MS))
+        except Exception:
+            return True
+
+    def _release_lease(self, lease_key: str, token: str) -> None:
+        """Release the recompute lease if we still own it."""
+        try:
+            if self.redis_client.get(lease_key) == token:
+                self.redis_client.delete(lease_key)
+        except Exception:
+            pass
+
     def delete(self, key: str) -> bool:
         """
         Delete key from cache.
@@ -57,14 +344,69 @@ class CacheService:
         Args:
             key: Cache key
 
+        Returns:
+            True if successful, False otherwise
+        """
+        self.l1_evict(key)
+        try:
+            deleted = bool(self.redis_client.delete(key))
+            self.redis_client.publish(INVALIDATION_CHANNEL, f"{self._instance_id} {key}")
+            return deleted
+        except Exception:
+            return False
+
+    def claim(self, key: str, ttl: int) -> bool:
+        """
+        Set a short-lived marker key only if it does not exist yet.
+
+        Args:
+            key: Cache key
+            ttl: Time to live in seconds
+
+        Returns:
+            True if the marker was set (or Redis is unavailable), False if it already exists
+        """
+        try:
+            return bool(self.redis_client.set(key, "1", nx=True, ex=ttl))
+        except Exception:
+            return True
+
+    def set_hash(self, key: str, mapping: Dict[str, Any], ttl: int) -> bool:
+        """
+        Merge fields into a hash and refresh its TTL.
+
+        Args:
+            key: Cache key
+            mapping: Fields to set (values stored as strings)
+            ttl: Time to live in seconds
+
         Returns:
             True if successful, False otherwise
         """
         try:
-            return bool(self.redis_client.delete(key))
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, mapping={field: str(value) for field, value in mapping.items()})
+            pipe.expire(key, ttl)
+            pipe.execute()
+            return True
         except Exception:
             return False
 
+    def get_hash(self, key: str) -> Dict[str, str]:
+        """
+        Get all fields of a hash.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Field mapping (empty if missing)
+        """
+        try:
+            return self.redis_client.hgetall(key)
+        except Exception:
+            return {}
+
     def exists(self, key: str) -> bool:
         """
         Check if key exists in cache.
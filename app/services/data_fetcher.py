@@ -4,11 +4,58 @@ import yfinance as yf
 import pandas as pd
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
+import threading
 import time
 from app.config import settings
 from app.models.stock import Market
 
 
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for calls to an upstream service.
+
+    After ``fail_max`` failures in a row the circuit opens and ``allow()``
+    refuses calls for ``reset_timeout`` seconds. The first call after that is
+    let through as a trial: a success closes the circuit, a failure reopens it.
+    """
+
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 60.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Half-open: one more failure reopens the circuit
+            self._opened_at = None
+            self._failures = self.fail_max - 1
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit at ``fail_max``."""
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.fail_max:
+                self._opened_at = time.monotonic()
+
+
+# Guards inline (request-path) Yahoo Finance lookups
+yahoo_breaker = CircuitBreaker(fail_max=5, reset_timeout=60.0)
+
+
 class DataFetcher:
     """Service for fetching stock data from various sources."""
 
@@ -2,20 +2,109 @@
 
 import pandas as pd
 import numpy as np
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Union
 from datetime import date
+from app.utils._njit import njit
+
+# Price inputs: a pandas Series or a 1-D numpy array
+PriceData = Union[pd.Series, np.ndarray]
+
+
+def _as_float_array(values: PriceData) -> np.ndarray:
+    """View price data as a contiguous float64 array (no copy if it already is one)."""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+@njit(cache=True)
+def _sma_last(values: np.ndarray, period: int) -> float:
+    """Mean of the last `period` values."""
+    n = values.shape[0]
+    total = 0.0
+    for i in range(n - period, n):
+        total += values[i]
+    return total / period
+
+
+@njit(cache=True)
+def _ema_last(values: np.ndarray, span: int) -> float:
+    """Last value of an EMA with adjust=False (seeded with the first value)."""
+    alpha = 2.0 / (span + 1.0)
+    ema = values[0]
+    for i in range(1, values.shape[0]):
+        ema = alpha * values[i] + (1.0 - alpha) * ema
+    return ema
+
+
+@njit(cache=True)
+def _rsi_last(close: np.ndarray, period: int) -> float:
+    """RSI from simple averages of the last `period` gains and losses."""
+    n = close.shape[0]
+    gain = 0.0
+    loss = 0.0
+    for i in range(n - period, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0.0:
+            gain += delta
+        elif delta < 0.0:
+            loss -= delta
+    gain /= period
+    loss /= period
+    if loss == 0.0:
+        # gain / 0 -> RSI 100; 0 / 0 -> undefined
+        return 100.0 if gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+@njit(cache=True)
+def _macd_last(close: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[float, float, float]:
+    """Last MACD line, signal line and histogram values in a single pass."""
+    alpha_fast = 2.0 / (fast + 1.0)
+    alpha_slow = 2.0 / (slow + 1.0)
+    alpha_signal = 2.0 / (signal + 1.0)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    macd_line = 0.0
+    signal_line = 0.0
+    for i in range(1, close.shape[0]):
+        ema_fast = alpha_fast * close[i] + (1.0 - alpha_fast) * ema_fast
+        ema_slow = alpha_slow * close[i] + (1.0 - alpha_slow) * ema_slow
+        macd_line = ema_fast - ema_slow
+        signal_line = alpha_signal * macd_line + (1.0 - alpha_signal) * signal_line
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit(cache=True)
+def _bbands_last(close: np.ndarray, period: int, std_dev: float) -> Tuple[float, float, float]:
+    """Last upper, middle and lower Bollinger Bands (sample standard deviation)."""
+    middle = _sma_last(close, period)
+    n = close.shape[0]
+    squares = 0.0
+    for i in range(n - period, n):
+        squares += (close[i] - middle) ** 2
+    std = np.sqrt(squares / (period - 1))
+    return middle + std * std_dev, middle, middle - std * std_dev
+
+
+def warmup() -> None:
+    """Compile (or load from the on-disk cache) every indicator kernel."""
+    dummy = np.zeros(30)
+    _sma_last(dummy, 20)
+    _ema_last(dummy, 12)
+    _rsi_last(dummy, 14)
+    _macd_last(dummy, 12, 26, 9)
+    _bbands_last(dummy, 20, 2.0)
 
 
 class IndicatorCalculator:
     """Service for calculating technical indicators."""
 
     @staticmethod
-    def calculate_rsi(prices: pd.Series, period: int = 14) -> Optional[float]:
+    def calculate_rsi(prices: PriceData, period: int = 14) -> Optional[float]:
         """
         Calculate Relative Strength Index (RSI).
 
         Args:
-            prices: Series of closing prices
+            prices: Series or array of closing prices
             period: RSI period (default 14)
 
         Returns:
@@ -25,26 +114,19 @@ class IndicatorCalculator:
             return None
 
         try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-
-            return float(rsi.iloc[-1])
+            return float(_rsi_last(_as_float_array(prices), period))
         except Exception:
             return None
 
     @staticmethod
     def calculate_macd(
-        prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9
+        prices: PriceData, fast: int = 12, slow: int = 26, signal: int = 9
     ) -> Dict[str, Optional[float]]:
         """
         Calculate MACD (Moving Average Convergence Divergence).
 
         Args:
-            prices: Series of closing prices
+            prices: Series or array of closing prices
             fast: Fast EMA period
             slow: Slow EMA period
             signal: Signal line period
@@ -56,27 +138,23 @@ class IndicatorCalculator:
             return {"macd": None, "macd_signal": None, "macd_histogram": None}
 
         try:
-            ema_fast = prices.ewm(span=fast, adjust=False).mean()
-            ema_slow = prices.ewm(span=slow, adjust=False).mean()
-            macd_line = ema_fast - ema_slow
-            signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-            histogram = macd_line - signal_line
+            macd_line, signal_line, histogram = _macd_last(_as_float_array(prices), fast, slow, signal)
 
             return {
-                "macd": float(macd_line.iloc[-1]),
-                "macd_signal": float(signal_line.iloc[-1]),
-                "macd_histogram": float(histogram.iloc[-1]),
+                "macd": float(macd_line),
+                "macd_signal": float(signal_line),
+                "macd_histogram": float(histogram),
             }
         except Exception:
             return {"macd": None, "macd_signal": None, "macd_histogram": None}
 
     @staticmethod
-    def calculate_sma(prices: pd.Series, period: int) -> Optional[float]:
+    def calculate_sma(prices: PriceData, period: int) -> Optional[float]:
         """
         Calculate Simple Moving Average.
 
         Args:
-            prices: Series of closing prices
+            prices: Series or array of closing prices
             period: SMA period
 
         Returns:
@@ -86,17 +164,17 @@ class IndicatorCalculator:
             return None
 
         try:
-            return float(prices.rolling(window=period).mean().iloc[-1])
+            return float(_sma_last(_as_float_array(prices), period))
         except Exception:
             return None
 
     @staticmethod
-    def calculate_ema(prices: pd.Series, period: int) -> Optional[float]:
+    def calculate_ema(prices: PriceData, period: int) -> Optional[float]:
         """
         Calculate Exponential Moving Average.
 
         Args:
-            prices: Series of closing prices
+            prices: Series or array of closing prices
             period: EMA period
 
         Returns:
@@ -106,19 +184,19 @@ class IndicatorCalculator:
             return None
 
         try:
-            return float(prices.ewm(span=period, adjust=False).mean().iloc[-1])
+            return float(_ema_last(_as_float_array(prices), period))
         except Exception:
             return None
 
     @staticmethod
     def calculate_bollinger_bands(
-        prices: pd.Series, period: int = 20, std_dev: int = 2
+        prices: PriceData, period: int = 20, std_dev: int = 2
     ) -> Dict[str, Optional[float]]:
         """
         Calculate Bollinger Bands.
 
         Args:
-            prices: Series of closing prices
+            prices: Series or array of closing prices
             period: Moving average period
             std_dev: Standard deviation multiplier
 
@@ -129,27 +207,23 @@ class IndicatorCalculator:
             return {"upper": None, "middle": None, "lower": None}
 
         try:
-            sma = prices.rolling(window=period).mean()
-            std = prices.rolling(window=period).std()
-
-            upper = sma + (std * std_dev)
-            lower = sma - (std * std_dev)
+            upper, middle, lower = _bbands_last(_as_float_array(prices), period, float(std_dev))
 
             return {
-                "upper": float(upper.iloc[-1]),
-                "middle": float(sma.iloc[-1]),
-                "lower": float(lower.iloc[-1]),
+                "upper": float(upper),
+                "middle": float(middle),
+                "lower": float(lower),
             }
         except Exception:
             return {"upper": None, "middle": None, "lower": None}
 
     @staticmethod
-    def calculate_volume_average(volumes: pd.Series, period: int = 20) -> Optional[float]:
+    def calculate_volume_average(volumes: PriceData, period: int = 20) -> Optional[float]:
         """
         Calculate average volume.
 
         Args:
-            volumes: Series of volume data
+            volumes: Series or array of volume data
             period: Period for average
 
         Returns:
@@ -159,7 +233,7 @@ class IndicatorCalculator:
             return None
 
         try:
-            return float(volumes.rolling(window=period).mean().iloc[-1])
+            return float(_sma_last(_as_float_array(volumes), period))
         except Exception:
             return None
 
@@ -179,8 +253,9 @@ class IndicatorCalculator:
         if prices_df.empty or "close" not in prices_df.columns:
             return {}
 
-        close_prices = prices_df["close"]
-        volumes = prices_df["volume"] if "volume" in prices_df.columns else pd.Series()
+        # Convert once; every indicator below runs on the same contiguous arrays
+        close_prices = _as_float_array(prices_df["close"])
+        volumes = _as_float_array(prices_df["volume"]) if "volume" in prices_df.columns else None
 
         indicators = {
             "rsi": IndicatorCalculator.calculate_rsi(close_prices),
@@ -202,7 +277,7 @@ class IndicatorCalculator:
         indicators["bollinger_lower"] = bb_data["lower"]
 
         # Volume average
-        if not volumes.empty:
+        if volumes is not None:
             indicators["volume_avg"] = IndicatorCalculator.calculate_volume_average(volumes)
 
         return indicators
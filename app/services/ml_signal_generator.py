@@ -1,20 +1,21 @@
 """ML-enhanced signal generation service."""
 
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
+import numpy as np
 import pandas as pd
 from app.models.signal import SignalType, RiskLevel, HoldingPeriod
-# Optional ML imports - only import if TensorFlow is available
-try:
-    from app.ml.models import LSTMForecaster, SignalClassifier
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
-    LSTMForecaster = None
-    SignalClassifier = None
+# Optional ML support - the models (and TensorFlow) are imported on first load
+from app.ml import ML_AVAILABLE
 from app.services.signal_generator import SignalGenerator
 from app.services.indicator_calculator import IndicatorCalculator
 import os
 
+if TYPE_CHECKING:
+    from app.ml.models import LSTMForecaster, SignalClassifier
+
+# Saved model formats: native Keras (current) and legacy HDF5
+MODEL_EXTENSIONS = (".keras", ".h5")
+
 
 class MLSignalGenerator:
     """
@@ -50,7 +51,7 @@ class MLSignalGenerator:
         self.lstm_models = {}  # Cache loaded models
         self.classifier = None
 
-    def _load_lstm_model(self, symbol: str, model_path: str = None) -> Optional[LSTMForecaster]:
+    def _load_lstm_model(self, symbol: str, model_path: str = None) -> Optional["LSTMForecaster"]:
         """Load LSTM model for a stock."""
         if symbol in self.lstm_models:
             return self.lstm_models[symbol]
@@ -60,7 +61,7 @@ class MLSignalGenerator:
             model_dir = "models"
             if not os.path.exists(model_dir):
                 return None
-            model_files = [f for f in os.listdir(model_dir) if f.startswith(f"lstm_{symbol}") and f.endswith(".h5")]
+            model_files = [f for f in os.listdir(model_dir) if f.startswith(f"lstm_{symbol}") and f.endswith(MODEL_EXTENSIONS)]
             if not model_files:
                 return None
             model_path = os.path.join(model_dir, sorted(model_files)[-1])  # Use latest
@@ -69,6 +70,8 @@ class MLSignalGenerator:
             return None
 
         try:
+            from app.ml.models import LSTMForecaster
+
             forecaster = LSTMForecaster()
             forecaster.load(model_path)
             self.lstm_models[symbol] = forecaster
@@ -76,7 +79,7 @@ class MLSignalGenerator:
         except Exception:
             return None
 
-    def _load_classifier(self, model_path: str = None) -> Optional[SignalClassifier]:
+    def _load_classifier(self, model_path: str = None) -> Optional["SignalClassifier"]:
         """Load signal classifier model."""
         if self.classifier is not None:
             return self.classifier
@@ -85,7 +88,7 @@ class MLSignalGenerator:
             model_dir = "models"
             if not os.path.exists(model_dir):
                 return None
-            model_files = [f for f in os.listdir(model_dir) if f.startswith("classifier_") and f.endswith(".h5")]
+            model_files = [f for f in os.listdir(model_dir) if f.startswith("classifier_") and f.endswith(MODEL_EXTENSIONS)]
             if not model_files:
                 return None
             model_path = os.path.join(model_dir, sorted(model_files)[-1])
@@ -94,6 +97,8 @@ class MLSignalGenerator:
             return None
 
         try:
+            from app.ml.models import SignalClassifier
+
             classifier = SignalClassifier()
             classifier.load(model_path)
             self.classifier = classifier
@@ -159,18 +164,22 @@ class MLSignalGenerator:
             classifier = self._load_classifier()
             if classifier:
                 try:
-                    # Prepare price features
-                    current_price = prices_df["close"].iloc[-1]
+                    # Prepare price features (on the raw column arrays)
+                    close = prices_df["close"].to_numpy(dtype=np.float64)
                     short_term = 0
                     medium_term = 0
-                    if len(prices_df) >= 20:
-                        short_term = ((prices_df["close"].iloc[-1] - prices_df["close"].iloc[-20]) / prices_df["close"].iloc[-20]) * 100
-                    if len(prices_df) >= 50:
-                        medium_term = ((prices_df["close"].iloc[-1] - prices_df["close"].iloc[-50]) / prices_df["close"].iloc[-50]) * 100
-                    
-                    volatility = prices_df["close"].pct_change().std() * 100 if len(prices_df) > 1 else 20
-                    volume_avg = prices_df["volume"].mean() if "volume" in prices_df.columns else 1
-                    current_volume = prices_df["volume"].iloc[-1] if "volume" in prices_df.columns else 1
+                    if len(close) >= 20:
+                        short_term = ((close[-1] - close[-20]) / close[-20]) * 100
+                    if len(close) >= 50:
+                        medium_term = ((close[-1] - close[-50]) / close[-50]) * 100
+
+                    volatility = np.std(np.diff(close) / close[:-1], ddof=1) * 100 if len(close) > 2 else 20
+                    volume_avg = 1
+                    current_volume = 1
+                    if "volume" in prices_df.columns:
+                        volume = prices_df["volume"].to_numpy(dtype=np.float64)
+                        volume_avg = volume.mean()
+                        current_volume = volume[-1]
                     volume_ratio = current_volume / volume_avg if volume_avg > 0 else 1
 
                     price_features = {
@@ -0,0 +1,150 @@
+"""Cached stock lookups (symbol to ID resolution, table size) for API routes."""
+
+import threading
+from typing import Optional
+from cachetools import TTLCache
+from sqlalchemy import inspect, lambda_stmt, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload
+from app.models.stock import Stock
+from app.schemas.stock import StockResponse
+from app.services.cache import cache_service
+
+# Upper-cased symbol -> stock ID for hot symbols (misses are not cached)
+_stock_ids: TTLCache = TTLCache(maxsize=4096, ttl=300)
+_stock_ids_lock = threading.Lock()
+
+# Resolved /stocks/{identifier} (ID or upper-cased symbol) -> StockResponse fields
+STOCK_RESOLVE_KEY = "stock:resolve:{identifier}"
+STOCK_RESOLVE_TTL = 3600
+
+# Unfiltered counts report the planner's row estimate once the table is at
+# least this large (exact counts are cheap below it)
+STOCK_ESTIMATE_MIN_ROWS = 100_000
+STOCK_ESTIMATE_KEY = "stock_count:estimate"
+STOCK_ESTIMATE_TTL = 60
+
+
+def _stock_id_stmt(symbol_upper: str):
+    return lambda_stmt(lambda: select(Stock.id).where(Stock.symbol == symbol_upper))
+
+
+def _cached_stock_id(symbol_upper: str) -> Optional[int]:
+    with _stock_ids_lock:
+        return _stock_ids.get(symbol_upper)
+
+
+def _remember_stock_id(symbol_upper: str, stock_id: Optional[int]) -> None:
+    if stock_id is not None:
+        with _stock_ids_lock:
+            _stock_ids[symbol_upper] = stock_id
+
+
+async def resolve_stock_id(db: AsyncSession, symbol: str) -> Optional[int]:
+    """
+    Resolve a stock symbol to its ID without loading the Stock row.
+
+    Args:
+        db: Async database session
+        symbol: Stock symbol (any case)
+
+    Returns:
+        Stock ID or None if the symbol is unknown
+    """
+    symbol_upper = symbol.upper()
+    stock_id = _cached_stock_id(symbol_upper)
+    if stock_id is None:
+        stock_id = await db.scalar(_stock_id_stmt(symbol_upper))
+        _remember_stock_id(symbol_upper, stock_id)
+    return stock_id
+
+
+def resolve_stock_id_sync(db: Session, symbol: str) -> Optional[int]:
+    """Sync variant of resolve_stock_id() for threadpool routes and tasks."""
+    symbol_upper = symbol.upper()
+    stock_id = _cached_stock_id(symbol_upper)
+    if stock_id is None:
+        stock_id = db.scalar(_stock_id_stmt(symbol_upper))
+        _remember_stock_id(symbol_upper, stock_id)
+    return stock_id
+
+
+async def resolve_stock_identifier(db: AsyncSession, identifier: str) -> Optional[StockResponse]:
+    """
+    Resolve a stock ID or symbol to the stock's response fields.
+
+    Served from Redis (and briefly in-process) when possible, so hot
+    identifiers skip the stocks SELECT; misses are not cached.
+
+    Args:
+        db: Async database session
+        identifier: Numeric stock ID or symbol (any case)
+
+    Returns:
+        StockResponse or None if no stock matches
+    """
+    cache_key = STOCK_RESOLVE_KEY.format(identifier=identifier.upper())
+    cached = await cache_service.get_async(cache_key, local=True)
+    if cached is not None:
+        return StockResponse.model_validate(cached)
+
+    # A character-class check, not int() in a try block: symbols are the common
+    # case and would raise every time. isdigit() alone also admits characters
+    # such as superscripts that int() rejects, hence the ASCII check.
+    # Lambda statements skip rebuilding and recompiling the SELECT per request.
+    # StockResponse only reads columns, never relationships.
+    if identifier.isascii() and identifier.isdigit():
+        stock_id = int(identifier)
+        stmt = lambda_stmt(lambda: select(Stock).where(Stock.id == stock_id).options(raiseload("*")))
+    else:
+        symbol = identifier.upper()
+        stmt = lambda_stmt(lambda: select(Stock).where(Stock.symbol == symbol).options(raiseload("*")))
+    stock = await db.scalar(stmt)
+    if stock is None:
+        return None
+
+    result = StockResponse.model_validate(stock)
+    await cache_service.set_async(cache_key, result.model_dump(mode="json"), STOCK_RESOLVE_TTL)
+    return result
+
+
+async def estimated_stock_count(db: AsyncSession) -> Optional[int]:
+    """
+    Approximate size of the stocks table from Postgres statistics.
+
+    Reads ``pg_class.reltuples`` (maintained by VACUUM/ANALYZE) instead of
+    counting rows, and caches it for STOCK_ESTIMATE_TTL.
+
+    Args:
+        db: Async database session
+
+    Returns:
+        Estimated row count, or None on other databases, before the table has
+        been analyzed, or while it is below STOCK_ESTIMATE_MIN_ROWS
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+    estimate = await cache_service.get_async(STOCK_ESTIMATE_KEY, local=True)
+    if estimate is None:
+        estimate = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'stocks'::regclass")
+        )
+        if estimate is None:
+            return None
+        await cache_service.set_async(STOCK_ESTIMATE_KEY, estimate, STOCK_ESTIMATE_TTL)
+    # reltuples is -1 until the table is first analyzed
+    return estimate if estimate >= STOCK_ESTIMATE_MIN_ROWS else None
+
+
+def clear_stock_id_cache() -> None:
+    """Drop all cached symbol -> ID mappings."""
+    with _stock_ids_lock:
+        _stock_ids.clear()
+
+
+def invalidate_stock(target: Stock) -> None:
+    """Invalidate cached IDs and resolved stocks for a changed or removed stock."""
+    clear_stock_id_cache()
+    identifiers = {str(target.id), target.symbol, *inspect(target).attrs.symbol.history.deleted}
+    for identifier in identifiers:
+        cache_service.delete(STOCK_RESOLVE_KEY.format(identifier=identifier))
@@ -2,6 +2,7 @@
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 from app.config import settings
 
 celery_app = Celery(
@@ -55,3 +56,11 @@ celery_app.conf.update(
         },
     },
 )
+
+
+@worker_process_init.connect
+def warm_up_indicator_kernels(**kwargs):
+    """Compile the indicator kernels before the first task in each worker process needs them."""
+    from app.services.indicator_calculator import warmup
+
+    warmup()
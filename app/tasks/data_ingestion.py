@@ -1,8 +1,10 @@
 """Celery tasks for data ingestion."""
 
 from celery import Task
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, date
+import numpy as np
 import pandas as pd
 from app.tasks.celery_app import celery_app
 from app.database import SessionLocal
@@ -12,6 +14,7 @@ from app.models.fundamental import Fundamental
 from app.models.technical_indicator import TechnicalIndicator
 from app.services.data_fetcher import DataFetcher
 from app.services.indicator_calculator import IndicatorCalculator
+from app.services.stock_classifier import StockClassifier
 
 
 @celery_app.task(name="fetch_stock_prices")
@@ -135,6 +138,14 @@ def update_fundamentals(symbol: str):
             )
             db.add(fundamental)
 
+        # Classify on ingest so signal generation can read stock.stock_type
+        stock.stock_type = StockClassifier.classify_stock(
+            dividend_yield=fundamental.dividend_yield,
+            earnings_growth=fundamental.earnings_growth,
+            pe_ratio=fundamental.pe_ratio,
+            dividend_payout_ratio=fundamental.dividend_payout_ratio,
+        )
+
         db.commit()
         return {"status": "success", "symbol": symbol}
     except Exception as e:
@@ -158,32 +169,37 @@ def calculate_indicators(symbol: str):
         if not stock:
             return {"status": "error", "message": f"Stock {symbol} not found"}
 
-        # Get recent price data
-        prices = (
-            db.query(StockPrice)
-            .filter(StockPrice.stock_id == stock.id)
+        # Get price data as plain column tuples, newest first so the limit
+        # keeps the latest bars
+        rows = db.execute(
+            select(
+                StockPrice.time,
+                StockPrice.open,
+                StockPrice.high,
+                StockPrice.low,
+                StockPrice.close,
+                StockPrice.volume,
+            )
+            .where(StockPrice.stock_id == stock.id)
             .order_by(StockPrice.time.desc())
             .limit(200)
-            .all()
-        )
+        ).all()
 
-        if len(prices) < 20:
+        if len(rows) < 20:
             return {"status": "error", "message": f"Insufficient price data for {symbol}"}
 
+        times, opens, highs, lows, closes, volumes = zip(*reversed(rows))
         prices_df = pd.DataFrame(
-            [
-                {
-                    "time": p.time,
-                    "open": p.open,
-                    "high": p.high,
-                    "low": p.low,
-                    "close": p.close,
-                    "volume": p.volume,
-                }
-                for p in prices
-            ]
+            {
+                "time": pd.to_datetime(times),
+                "open": np.asarray(opens, dtype=np.float64),
+                "high": np.asarray(highs, dtype=np.float64),
+                "low": np.asarray(lows, dtype=np.float64),
+                "close": np.asarray(closes, dtype=np.float64),
+                "volume": np.asarray(volumes, dtype=np.float64),
+            },
+            copy=False,
         )
-        prices_df = prices_df.sort_values("time")
 
         # Calculate indicators
         indicators = IndicatorCalculator.calculate_all_indicators(prices_df)
@@ -1,20 +1,36 @@
 """Automated ML training Celery tasks."""
 
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from celery.schedules import crontab
 from app.tasks.celery_app import celery_app
 from app.database import SessionLocal
 from app.models.stock import Stock
+from app.services.cache import cache_service
 
-# Optional ML imports
-try:
-    from app.ml.training import train_lstm_model, train_classifier_model
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
-    train_lstm_model = None
-    train_classifier_model = None
+# Optional ML support - training code (and TensorFlow) is imported per task
+from app.ml import ML_AVAILABLE
+
+# Redis hash with progress of a training job, keyed by Celery task ID
+ML_JOB_KEY = "ml:job:{job_id}"
+
+
+def record_job_progress(job_id: str, status: str, **fields) -> None:
+    """
+    Record progress of a training job for the jobs API.
+
+    Args:
+        job_id: Celery task ID
+        status: Current stage (queued, loading, training, success, ...)
+        **fields: Extra fields to store with the stage
+    """
+    if not job_id:
+        return
+    cache_service.set_hash(
+        ML_JOB_KEY.format(job_id=job_id),
+        {"status": status, "updated_at": datetime.now(timezone.utc).isoformat(), **fields},
+        celery_app.conf.result_expires,
+    )
 
 
 @celery_app.task(name="train_lstm_for_stock", bind=True, max_retries=3)
@@ -30,17 +46,21 @@ def train_lstm_for_stock(self, stock_id: int, sequence_length: int = 60, epochs:
     Returns:
         Training results dictionary
     """
+    job_id = self.request.id
+    record_job_progress(job_id, "loading", stock_id=stock_id)
     try:
         db = SessionLocal()
         try:
             stock = db.query(Stock).filter(Stock.id == stock_id).first()
             if not stock:
+                record_job_progress(job_id, "error")
                 return {"status": "error", "message": f"Stock {stock_id} not found"}
             
             # Check if stock has sufficient price data
             from app.models.price import StockPrice
             price_count = db.query(StockPrice).filter(StockPrice.stock_id == stock_id).count()
             if price_count < 100:
+                record_job_progress(job_id, "skipped")
                 return {
                     "status": "skipped",
                     "message": f"Insufficient price data: {price_count} records (need 100+)",
@@ -49,20 +69,25 @@ def train_lstm_for_stock(self, stock_id: int, sequence_length: int = 60, epochs:
                 }
             
             # Train model
-            if not ML_AVAILABLE or train_lstm_model is None:
+            if not ML_AVAILABLE:
+                record_job_progress(job_id, "error")
                 return {
                     "status": "error",
                     "message": "ML training not available. TensorFlow is not installed.",
                     "stock_id": stock_id,
                 }
             
+            from app.ml.training import train_lstm_model
+
+            record_job_progress(job_id, "training", epochs=epochs)
             result = train_lstm_model(
                 stock_id=stock_id,
                 sequence_length=sequence_length,
                 epochs=epochs,
-                model_save_path=f"models/lstm_{stock.symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.h5"
+                model_save_path=f"models/lstm_{stock.symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.keras"
             )
             
+            record_job_progress(job_id, "success")
             return {
                 "status": "success",
                 "stock_id": stock_id,
@@ -71,12 +96,13 @@ def train_lstm_for_stock(self, stock_id: int, sequence_length: int = 60, epochs:
                 "final_loss": result["final_loss"],
                 "final_val_loss": result.get("final_val_loss"),
                 "epochs": epochs,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
             }
         finally:
             db.close()
     except Exception as e:
         # Retry on failure
+        record_job_progress(job_id, "retrying", error=str(e))
         raise self.retry(exc=e, countdown=300)  # Retry after 5 minutes
 
 
@@ -92,6 +118,8 @@ def train_classifier_model_task(self, stock_ids: list = None, epochs: int = 100)
     Returns:
         Training results dictionary
     """
+    job_id = self.request.id
+    record_job_progress(job_id, "loading")
     try:
         db = SessionLocal()
         try:
@@ -99,26 +127,32 @@ def train_classifier_model_task(self, stock_ids: list = None, epochs: int = 100)
             from app.models.signal import SignalHistory
             signal_count = db.query(SignalHistory).count()
             if signal_count < 100:
+                record_job_progress(job_id, "skipped")
                 return {
                     "status": "skipped",
                     "message": f"Insufficient signal history: {signal_count} records (need 100+)",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
                 }
             
             # Train model
-            if not ML_AVAILABLE or train_classifier_model is None:
+            if not ML_AVAILABLE:
+                record_job_progress(job_id, "error")
                 return {
                     "status": "error",
                     "message": "ML training not available. TensorFlow is not installed.",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
                 }
             
+            from app.ml.training import train_classifier_model
+
+            record_job_progress(job_id, "training", epochs=epochs)
             result = train_classifier_model(
                 stock_ids=stock_ids,
                 epochs=epochs,
-                model_save_path=f"models/classifier_{datetime.now().strftime('%Y%m%d_%H%M%S')}.h5"
+                model_save_path=f"models/classifier_{datetime.now().strftime('%Y%m%d_%H%M%S')}.keras"
             )
             
+            record_job_progress(job_id, "success")
             return {
                 "status": "success",
                 "model_path": result["model_path"],
@@ -126,12 +160,13 @@ def train_classifier_model_task(self, stock_ids: list = None, epochs: int = 100)
                 "final_accuracy": result["final_accuracy"],
                 "final_val_accuracy": result.get("final_val_accuracy"),
                 "epochs": epochs,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
             }
         finally:
             db.close()
     except Exception as e:
         # Retry on failure
+        record_job_progress(job_id, "retrying", error=str(e))
         raise self.retry(exc=e, countdown=600)  # Retry after 10 minutes
 
 
@@ -172,7 +207,7 @@ def train_lstm_for_all_stocks(sequence_length: int = 60, epochs: int = 50):
             "status": "success",
             "stocks_queued": len(stocks),
             "results": results,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -198,7 +233,7 @@ def retrain_classifier_model(epochs: int = 100):
             "status": "queued",
             "task_id": result.id,
             "message": "Classifier training task queued",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
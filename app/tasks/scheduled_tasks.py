@@ -5,7 +5,7 @@ from app.tasks.celery_app import celery_app
 from app.tasks.data_ingestion import fetch_stock_prices, update_fundamentals, calculate_indicators
 from app.database import SessionLocal
 from app.models.stock import Stock
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 @celery_app.task(name="update_all_stock_prices")
@@ -30,7 +30,7 @@ def update_all_stock_prices():
             "status": "success",
             "stocks_updated": len(stocks),
             "results": results,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -60,7 +60,7 @@ def update_all_fundamentals():
             "status": "success",
             "stocks_updated": len(stocks),
             "results": results,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -90,7 +90,7 @@ def recalculate_all_indicators():
             "status": "success",
             "stocks_updated": len(stocks),
             "results": results,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -1,5 +1,9 @@
 """Celery tasks for signal generation."""
 
+from typing import Optional
+import threading
+from celery.signals import worker_process_init
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.tasks.celery_app import celery_app
 from app.database import SessionLocal
@@ -12,10 +16,84 @@ from app.services.signal_generator import SignalGenerator
 from app.services.indicator_calculator import IndicatorCalculator
 from app.services.explanation_generator import ExplanationGenerator
 from app.services.data_fetcher import DataFetcher
+from app.services.ml_signal_generator import MLSignalGenerator
 from app.services.cache import cache_service
+from app.schemas.signal import SignalResponse
 from app.config import settings
+import numpy as np
 import pandas as pd
 
+# Dedicated queue for on-demand regeneration (consumed by the signal-worker process)
+SIGNAL_QUEUE = "signal-generation"
+# Cached response envelope of a stock's current signal
+SIGNAL_CACHE_KEY = "signal_envelope:{symbol}"
+# Marker held while a refresh for a symbol is queued or running
+SIGNAL_REFRESH_KEY = "signal:refresh:{symbol}"
+
+# Per-process ML generator so loaded models are reused across tasks and requests
+_ml_generator: Optional[MLSignalGenerator] = None
+_ml_generator_lock = threading.Lock()
+
+
+def get_ml_generator() -> MLSignalGenerator:
+    """Return this process's shared ML signal generator (created on first use)."""
+    global _ml_generator
+    if _ml_generator is None:
+        # API handlers run in a threadpool; only one thread may construct it
+        with _ml_generator_lock:
+            if _ml_generator is None:
+                _ml_generator = MLSignalGenerator(use_lstm=True, use_classifier=True, fallback_to_rules=True)
+    return _ml_generator
+
+
+@worker_process_init.connect
+def preload_ml_models(**kwargs):
+    """Load the signal classifier up front in workers serving the signal queue."""
+    if SIGNAL_QUEUE in celery_app.amqp.queues.consume_from:
+        get_ml_generator()._load_classifier()
+
+
+@celery_app.task(name="signals.generate", queue=SIGNAL_QUEUE)
+def generate_signal_task(symbol: str, use_ml: bool = True):
+    """
+    Regenerate a stock's signal and warm its cache entry.
+
+    Enqueued by the signal endpoint when the latest stored signal is stale.
+
+    Args:
+        symbol: Stock symbol (also used for the cache key)
+        use_ml: Use ML models if available
+    """
+    # Imported lazily: the generators live with the API routes
+    from app.api.v1.signals import _cache_signal, _generate_signal_for_stock, _generate_signal_for_stock_with_ml
+
+    db: Session = SessionLocal()
+    try:
+        stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+        if not stock:
+            return {"status": "error", "message": f"Stock {symbol} not found"}
+
+        if use_ml:
+            signal = _generate_signal_for_stock_with_ml(stock, db)
+        else:
+            signal = _generate_signal_for_stock(stock, db)
+
+        result = SignalResponse.model_validate(signal)
+        _cache_signal(SIGNAL_CACHE_KEY.format(symbol=symbol), result)
+
+        return {
+            "status": "success",
+            "symbol": stock.symbol,
+            "signal_type": result.signal_type.value,
+            "confidence": result.confidence_score,
+        }
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        cache_service.delete(SIGNAL_REFRESH_KEY.format(symbol=symbol))
+        db.close()
+
 
 @celery_app.task(name="generate_signal")
 def generate_signal(symbol: str):
@@ -31,32 +109,37 @@ def generate_signal(symbol: str):
         if not stock:
             return {"status": "error", "message": f"Stock {symbol} not found"}
 
-        # Get price data
-        prices = (
-            db.query(StockPrice)
-            .filter(StockPrice.stock_id == stock.id)
+        # Get price data as plain column tuples, newest first so the limit
+        # keeps the latest bars
+        rows = db.execute(
+            select(
+                StockPrice.time,
+                StockPrice.open,
+                StockPrice.high,
+                StockPrice.low,
+                StockPrice.close,
+                StockPrice.volume,
+            )
+            .where(StockPrice.stock_id == stock.id)
             .order_by(StockPrice.time.desc())
             .limit(200)
-            .all()
-        )
+        ).all()
 
-        if not prices:
+        if not rows:
             return {"status": "error", "message": f"Insufficient price data for {symbol}"}
 
+        times, opens, highs, lows, closes, volumes = zip(*reversed(rows))
         prices_df = pd.DataFrame(
-            [
-                {
-                    "time": p.time,
-                    "open": p.open,
-                    "high": p.high,
-                    "low": p.low,
-                    "close": p.close,
-                    "volume": p.volume,
-                }
-                for p in prices
-            ]
+            {
+                "time": pd.to_datetime(times),
+                "open": np.asarray(opens, dtype=np.float64),
+                "high": np.asarray(highs, dtype=np.float64),
+                "low": np.asarray(lows, dtype=np.float64),
+                "close": np.asarray(closes, dtype=np.float64),
+                "volume": np.asarray(volumes, dtype=np.float64),
+            },
+            copy=False,
         )
-        prices_df = prices_df.sort_values("time")
 
         # Get indicators
         latest_indicator = (
@@ -161,8 +244,7 @@ def generate_signal(symbol: str):
         db.commit()
 
         # Clear cache
-        cache_key = f"signal:{symbol}"
-        cache_service.delete(cache_key)
+        cache_service.delete(SIGNAL_CACHE_KEY.format(symbol=symbol))
 
         return {
             "status": "success",
@@ -0,0 +1 @@
+"""Shared low-level utilities."""
@@ -0,0 +1,20 @@
+"""Optional Numba JIT decorator with a pure-Python fallback."""
+
+# Optional import - only JIT-compile if Numba is available
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit, usable bare or with options."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+__all__ = ["njit", "NUMBA_AVAILABLE"]
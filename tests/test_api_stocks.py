@@ -1,25 +1,8 @@
 """Tests for stock API endpoints."""
 
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
-from app.database import SessionLocal, Base, engine
 from app.models.stock import Stock, Market, AssetType
 
-client = TestClient(app)
-
-
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a test database session."""
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
-
 
 @pytest.fixture
 def sample_stock(db_session):
@@ -38,7 +21,7 @@ def sample_stock(db_session):
     return stock
 
 
-def test_list_stocks_empty(db_session):
+def test_list_stocks_empty(client):
     """Test listing stocks when database is empty."""
     response = client.get("/api/v1/stocks")
     assert response.status_code == 200
@@ -48,7 +31,7 @@ def test_list_stocks_empty(db_session):
     assert len(data["data"]["items"]) == 0
 
 
-def test_list_stocks_with_data(sample_stock):
+def test_list_stocks_with_data(client, sample_stock):
     """Test listing stocks with data."""
     response = client.get("/api/v1/stocks")
     assert response.status_code == 200
@@ -59,7 +42,7 @@ def test_list_stocks_with_data(sample_stock):
     assert data["data"]["items"][0]["symbol"] == "TEST"
 
 
-def test_get_stock_by_symbol(sample_stock):
+def test_get_stock_by_symbol(client, sample_stock):
     """Test getting a stock by symbol."""
     response = client.get("/api/v1/stocks/TEST")
     assert response.status_code == 200
@@ -69,7 +52,7 @@ def test_get_stock_by_symbol(sample_stock):
     assert data["data"]["name"] == "Test Stock"
 
 
-def test_get_stock_by_id(sample_stock):
+def test_get_stock_by_id(client, sample_stock):
     """Test getting a stock by ID."""
     response = client.get(f"/api/v1/stocks/{sample_stock.id}")
     assert response.status_code == 200
@@ -78,13 +61,13 @@ def test_get_stock_by_id(sample_stock):
     assert data["data"]["id"] == sample_stock.id
 
 
-def test_get_stock_not_found():
+def test_get_stock_not_found(client):
     """Test getting a non-existent stock."""
     response = client.get("/api/v1/stocks/NONEXISTENT")
     assert response.status_code == 404
 
 
-def test_create_stock(db_session):
+def test_create_stock(client):
     """Test creating a new stock."""
     stock_data = {
         "symbol": "NEW",
@@ -100,7 +83,7 @@ def test_create_stock(db_session):
     assert data["data"]["asset_type"] == "STOCK"  # Default
 
 
-def test_create_stock_duplicate(sample_stock):
+def test_create_stock_duplicate(client, sample_stock):
     """Test creating a duplicate stock."""
     stock_data = {
         "symbol": "TEST",
@@ -111,7 +94,7 @@ def test_create_stock_duplicate(sample_stock):
     assert response.status_code == 400
 
 
-def test_filter_stocks_by_market(db_session):
+def test_filter_stocks_by_market(client, db_session):
     """Test filtering stocks by market."""
     # Create US stock
     us_stock = Stock(
@@ -150,7 +133,7 @@ def test_filter_stocks_by_market(db_session):
     assert data["data"]["items"][0]["market"] == "NGX"
 
 
-def test_filter_stocks_by_asset_type(db_session):
+def test_filter_stocks_by_asset_type(client, db_session):
     """Test filtering stocks by asset type."""
     # Create stock
     stock = Stock(
@@ -0,0 +1,35 @@
+"""Tests for backtest kernels."""
+
+import numpy as np
+from app.services.backtest import _simulate_trades, _equity_curve_loop
+
+
+def test_simulate_trades_flips_positions():
+    """Test BUY/SELL signals open, flip and finally close positions."""
+    price_days = np.array([1, 2, 3, 4], dtype=np.int64)
+    closes = np.array([100.0, 110.0, 99.0, 90.0])
+    signal_days = np.array([1, 2, 3], dtype=np.int64)
+    signal_codes = np.array([1, -1, 0], dtype=np.int8)
+
+    sides, entry_signals, exit_signals, entry_prices, exit_prices, pnls = _simulate_trades(
+        price_days, closes, signal_days, signal_codes
+    )
+
+    assert list(sides) == [1, -1]
+    assert list(entry_signals) == [0, 1]
+    assert list(exit_signals) == [1, -1]
+    assert list(exit_prices) == [110.0, 90.0]
+    assert np.allclose(pnls, [10.0, (110.0 - 90.0) / 110.0 * 100])
+
+
+def test_equity_curve_loop_metrics():
+    """Test equity curve, win rate and drawdown from trade P&Ls."""
+    equity, total_return, win_rate, max_drawdown, volatility, sharpe = _equity_curve_loop(
+        np.array([10.0, -5.0, 5.0])
+    )
+    assert np.allclose(equity, [10.0, 5.0, 10.0])
+    assert total_return == 10.0
+    assert round(win_rate, 2) == 66.67
+    assert max_drawdown < 0
+    assert volatility > 0
+    assert sharpe > 0
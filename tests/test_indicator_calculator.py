@@ -43,6 +43,26 @@ def test_calculate_bollinger_bands():
         assert bb_data["upper"] > bb_data["middle"] > bb_data["lower"]
 
 
+def test_kernels_match_pandas_formulas():
+    """Test indicator kernels against the equivalent pandas rolling/ewm formulas."""
+    prices = pd.Series(100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 120)))
+
+    delta = prices.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    expected_rsi = (100 - 100 / (1 + gain / loss)).iloc[-1]
+    macd_line = prices.ewm(span=12, adjust=False).mean() - prices.ewm(span=26, adjust=False).mean()
+    expected_signal = macd_line.ewm(span=9, adjust=False).mean().iloc[-1]
+    expected_upper = (prices.rolling(20).mean() + 2 * prices.rolling(20).std()).iloc[-1]
+
+    assert IndicatorCalculator.calculate_rsi(prices) == pytest.approx(expected_rsi)
+    assert IndicatorCalculator.calculate_macd(prices)["macd_signal"] == pytest.approx(expected_signal)
+    assert IndicatorCalculator.calculate_bollinger_bands(prices)["upper"] == pytest.approx(expected_upper)
+    assert IndicatorCalculator.calculate_ema(prices.to_numpy(), 26) == pytest.approx(
+        prices.ewm(span=26, adjust=False).mean().iloc[-1]
+    )
+
+
 def test_calculate_all_indicators():
     """Test calculation of all indicators."""
     prices_df = pd.DataFrame(